@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: RealDictCursor + pd.DataFrame(dicts) contra leitura colunar.
+Simula as linhas de db_metrics_history sem precisar de banco.
+Execute: python3 benchmarks/bench_fetch.py [20 10000 1000000]
+"""
+
+import os, sys, time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sentinel.columnar import frame_from_rows
+
+Column = namedtuple("Column", "name type_code")
+DESCRIPTION = [
+    Column("id", 23), Column("timestamp", 1184), Column("cpu_usage", 701),
+    Column("active_connections", 23), Column("avg_latency_ms", 701), Column("slow_queries_count", 23),
+]
+
+
+def make_rows(n):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [(i, start + timedelta(seconds=i), 10.0 + i % 80, 5 + i % 40, 1.5 + (i % 17) / 3, i % 7)
+            for i in range(n)]
+
+
+def dict_path(rows):
+    # Equivalente ao RealDictCursor: um dict por linha, depois inferência de colunas
+    names = [d.name for d in DESCRIPTION]
+    return pd.DataFrame([dict(zip(names, row)) for row in rows])
+
+
+def columnar_path(rows):
+    return frame_from_rows(rows, DESCRIPTION)
+
+
+def best_of(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes):
+    print(f"{'linhas':>10} {'dicts (ms)':>12} {'colunar (ms)':>13} {'ganho':>7}")
+    for n in sizes:
+        rows = make_rows(n)
+        repeat = 20 if n <= 10_000 else 3
+        a = best_of(dict_path, rows, repeat)
+        b = best_of(columnar_path, rows, repeat)
+        print(f"{n:>10} {a*1000:>12.2f} {b*1000:>13.2f} {a/b:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [20, 10_000, 1_000_000])
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização dos gráficos a cada rerun: o mesmo caminho do
+st.plotly_chart (return_figure_from_figure_or_data + plotly.io.to_json) para a
+figura memorizada comum e para a FrozenFigure, que guarda o dict pronto.
+Execute: python3 benchmarks/bench_figures.py [pontos] [repetições]
+"""
+
+import json, os, sys, time
+from datetime import timedelta
+
+import plotly.io as pio
+import plotly.tools as pt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sentinel import fake_db, figures, history
+
+
+def serialize(fig):
+    # O que o st.plotly_chart faz com a figura em todo rerun
+    return pio.to_json(pt.return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+
+
+def timed(fig, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        payload = serialize(fig)
+    return (time.perf_counter() - t0) / reps * 1000, len(payload)
+
+
+def main(points, reps):
+    df = history.fetch_history(fake_db.connect(), timedelta(days=1), points).sort_values("timestamp")
+    print(f"{len(df)} linhas, {reps} repetições")
+    print(f"{'gráfico':>12} {'JSON':>8} {'go.Figure':>11} {'FrozenFigure':>13}")
+    for name, build in figures.BUILDERS.items():
+        fig = build(df)
+        frozen = figures.FrozenFigure(fig)
+        assert json.loads(serialize(fig)) == json.loads(serialize(frozen))   # mesmo conteúdo
+        t_plain, size = timed(fig, reps)
+        t_frozen, _ = timed(frozen, reps)
+        print(f"{name:>12} {size/1024:>6.0f}KB {t_plain:>9.2f}ms {t_frozen:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
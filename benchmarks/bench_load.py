@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga do dashboard: muitas sessões simuladas com o AppTest do
+Streamlit, no mesmo processo (caches, coletor e pool compartilhados como num
+servidor de verdade). O AppTest troca um singleton do Runtime a cada run(),
+então os reruns das sessões são intercalados, um por vez; o coletor e as
+atualizações do cache seguem em paralelo. Cada sessão entra já autenticada e,
+a cada rodada, faz uma ação (rerun, troca de janela do histórico, filtro/página de processos,
+diagnóstico). O banco é o driver falso sentinel.fake_db (métricas sintéticas
+e ~300 sessões de pg_stat_activity com latência simulada) ou, com --dsn, um
+Postgres local: db_metrics_history é semeado e conexões extras fazem o papel
+das sessões de pg_stat_activity. O modelo é sempre o FakeModel (determinístico).
+
+Mede latência do rerun (p50/p95/max), consultas ao banco por rerun (as do
+coletor em segundo plano separadas) e memória por sessão (tracemalloc, numa
+fase à parte). O resultado é anexado em bench_output.txt para comparar rodadas.
+Execute: python3 benchmarks/bench_load.py [--sessions 1,10,50] [--rounds 5] [--latency-ms 2] [--dsn postgresql://...]
+"""
+
+import argparse, os, subprocess, sys, threading, time, tracemalloc
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+from streamlit.testing.v1 import AppTest
+from sentinel import fake_db, history, processes, schema, tracing
+
+APP = os.path.join(ROOT, "app.py")
+SECRETS = {"SUPABASE_HOST": "127.0.0.1", "DB_NAME": "bench", "DB_USER": "bench", "DB_PASS": "bench",
+           "FAKE_LLM": True, "COLLECT_INTERVAL_S": 1}
+# Threads que rodam consultas por causa de um rerun (script, atualizações do SWR, jobs de diagnóstico)
+RERUN_THREADS = ("ScriptRunner.scriptThread", "db-sentinel-cache", "db-sentinel-job")
+RANGE_NAMES = list(history.RANGES)
+
+
+# --- AÇÕES DE UMA SESSÃO ---
+def act_rerun(at, i):
+    at.run()
+
+def act_range(at, i):
+    at.radio(key="history_range").set_value(RANGE_NAMES[i % len(RANGE_NAMES)]).run()
+
+def act_filter(at, i):
+    states = [processes.BUSY_STATES[:1], processes.BUSY_STATES][i % 2]
+    at.multiselect(key="proc_states").set_value(list(states))
+    at.selectbox(key="proc_sort").set_value(list(processes.SORTS)[i % len(processes.SORTS)]).run()
+
+def act_next_page(at, i):
+    buttons = [b for b in at.button if b.key == "proc_next"]
+    (buttons[0].click() if buttons else at).run()
+
+def act_diagnosis(at, i):
+    at.button(key="diag").click().run()
+
+ACTIONS = [act_rerun, act_range, act_filter, act_next_page, act_rerun, act_diagnosis]
+
+
+def new_session(secrets):
+    at = AppTest.from_file(APP, default_timeout=120)
+    for key, value in secrets.items():
+        at.secrets[key] = value
+    # Login e splash ficam fora da medição (ver bench_startup.py)
+    at.session_state["authenticated"] = True
+    return at
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    fn(*args)
+    return 1000 * (time.perf_counter() - t)
+
+
+def failed(at):
+    return bool(at.exception) or any("Erro" in e.value for e in at.error)
+
+
+# --- CONTAGEM DE CONSULTAS ---
+def query_counts(fake):
+    # {(tipo, thread): n}; no Postgres de verdade só há o total dos spans db.query
+    if fake:
+        return fake_db.counts()
+    return Counter({("db.query", "todas"): sum(r["count"] for r in tracing.tracer.stats() if r["span"] == "db.query")})
+
+
+def split_counts(delta):
+    rerun = sum(n for (kind, thread), n in delta.items() if thread in RERUN_THREADS or thread == "todas")
+    background = sum(n for (kind, thread), n in delta.items() if thread == "db-sentinel-collector")
+    by_kind = Counter()
+    for (kind, thread), n in delta.items():
+        by_kind[kind] += n
+    return rerun, background, by_kind
+
+
+# --- FASES ---
+def run_level(n, rounds, secrets, fake):
+    sessions = [new_session(secrets) for _ in range(n)]
+    first = [timed(at.run) for at in sessions]
+    before = query_counts(fake)
+    started = time.perf_counter()
+    latencies = []
+    for r in range(rounds):
+        for i, at in enumerate(sessions):
+            latencies.append(timed(ACTIONS[(r + i) % len(ACTIONS)], at, r + i))
+    elapsed = time.perf_counter() - started
+    rerun_q, background_q, by_kind = split_counts(query_counts(fake) - before)
+    lat = np.array(latencies)
+    return {
+        "sessions": n, "reruns": len(latencies), "elapsed_s": elapsed,
+        "first_p50": float(np.median(first)),
+        "p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95)), "max": float(lat.max()),
+        "queries_per_rerun": rerun_q / len(latencies), "background": background_q, "by_kind": by_kind,
+        "errors": sum(failed(at) for at in sessions),
+    }
+
+
+def session_memory(n, secrets):
+    # Uma sessão de aquecimento carrega módulos e caches compartilhados; depois
+    # o tracemalloc mede só o que cada sessão nova acrescenta
+    warm = new_session(secrets)
+    warm.run()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    for i in range(n):
+        at = new_session(secrets)
+        at.run()
+        act_range(at, i + 1)
+        sessions.append(at)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return used / n / 1024
+
+
+# --- POSTGRES LOCAL ---
+def prepare_postgres(dsn, seed_days, pg_sessions):
+    import psycopg2
+    from psycopg2.extensions import parse_dsn
+    params = parse_dsn(dsn)
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    # Banco novo não tem db_metrics_history: cria (particionada, com rollups) antes de semear
+    schema.migrate(conn)
+    if seed_days:
+        print(f"semeando {fake_db.seed(conn, days=seed_days)} linhas em db_metrics_history...")
+        schema.maintain(conn)   # partições do dia e rollups, como o amostrador com --maintain
+    # Sessões extras em pg_stat_activity: ativas (pg_sleep), idle in transaction e idle
+    holders = []
+    for i in range(pg_sessions):
+        c = psycopg2.connect(dsn, application_name="bench_load")
+        kind = i % 3
+        if kind == 0:
+            threading.Thread(target=lambda c=c: c.cursor().execute("SELECT pg_sleep(3600)"), daemon=True).start()
+        elif kind == 1:
+            c.cursor().execute(f"SELECT {i} /* bench idle in transaction */")
+        else:
+            c.autocommit = True
+            c.cursor().execute(f"SELECT {i} /* bench idle */")
+        holders.append(c)
+    secrets = {"SUPABASE_HOST": params.get("host", "127.0.0.1"), "DB_NAME": params.get("dbname", "postgres"),
+               "DB_USER": params.get("user", ""), "DB_PASS": params.get("password", ""),
+               "DB_PORT": params.get("port", "5432"), "PERF_TRACING": True}
+    return secrets, holders
+
+
+def git_rev():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT)
+    return proc.stdout.strip() or "?"
+
+
+def report(results, memory_kb, header):
+    lines = [header,
+             f"{'sessões':>8}{'reruns':>8}{'1º render':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}"
+             f"{'consultas/rerun':>17}{'coletor':>9}{'erros':>7}{'reruns/s':>10}"]
+    for r in results:
+        lines.append(f"{r['sessions']:>8}{r['reruns']:>8}{r['first_p50']:>11.0f}{r['p50']:>10.0f}{r['p95']:>10.0f}"
+                     f"{r['max']:>10.0f}{r['queries_per_rerun']:>17.2f}{r['background']:>9}{r['errors']:>7}"
+                     f"{r['reruns'] / r['elapsed_s']:>10.1f}")
+    for r in results:
+        kinds = ", ".join(f"{k} {n}" for k, n in r["by_kind"].most_common())
+        lines.append(f"  consultas com {r['sessions']} sessões: {kinds or '-'}")
+    lines.append(f"memória por sessão: {memory_kb:.0f} KB (tracemalloc)")
+    return "\n".join(lines)
+
+
+def main(args):
+    levels = [int(n) for n in args.sessions.split(",")]
+    secrets = dict(SECRETS)
+    if args.dsn:
+        extra, holders = prepare_postgres(args.dsn, args.seed_days, args.pg_sessions)
+        secrets.update(extra)
+        driver = f"postgres ({secrets['SUPABASE_HOST']}:{secrets['DB_PORT']}/{secrets['DB_NAME']})"
+    else:
+        fake_db.configure(sessions=args.pg_sessions, latency_ms=args.latency_ms)
+        secrets["FAKE_DB"] = True
+        driver = f"fake_db (latência {args.latency_ms:g}ms)"
+    header = (f"=== bench_load {datetime.now():%Y-%m-%d %H:%M:%S} | git {git_rev()} | {driver} | "
+              f"{args.pg_sessions} sessões pg | {args.rounds} rodadas ===")
+
+    results = []
+    for n in levels:
+        results.append(run_level(n, args.rounds, secrets, not args.dsn))
+        r = results[-1]
+        print(f"{n} sessões: p50 {r['p50']:.0f}ms, p95 {r['p95']:.0f}ms, {r['queries_per_rerun']:.2f} consultas/rerun")
+    memory_kb = session_memory(args.memory_sessions, secrets)
+
+    text = report(results, memory_kb, header)
+    print("\n" + text)
+    with open(args.output, "a") as f:
+        f.write(text + "\n\n")
+    print(f"\nResultado anexado em {args.output}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="1,10,50", help="níveis de sessões simultâneas, separados por vírgula")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="latência simulada por consulta (fake_db)")
+    parser.add_argument("--pg-sessions", type=int, default=300, help="sessões sintéticas em pg_stat_activity")
+    parser.add_argument("--memory-sessions", type=int, default=10)
+    parser.add_argument("--dsn", help="Postgres local em vez do fake_db")
+    parser.add_argument("--seed-days", type=int, default=7, help="dias de db_metrics_history semeados com --dsn")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_output.txt"))
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark do grafo de bloqueios com fixture sintética (sem banco).
+Gera cadeias de espera de profundidade variada, alguns bloqueadores com
+muitos bloqueados e um ciclo, e mede a montagem do grafo e da árvore.
+Execute: python3 benchmarks/bench_locks.py [1000 10000 100000]
+"""
+
+import os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sentinel.locks import build_lock_graph
+
+
+def make_rows(n, seed=7):
+    rng = random.Random(seed)
+    rows, pid = [], 1000
+    while len(rows) < n:
+        root = pid
+        pid += 1
+        rows.append({"pid": root, "usuario": "app", "status": "idle in transaction",
+                     "duracao_ms": 60_000.0, "query": "UPDATE contas SET saldo = saldo - ? WHERE id = ?",
+                     "blocked_by": []})
+        frontier = [root]
+        for _ in range(rng.randint(1, 6)):                  # profundidade da cadeia
+            nxt = []
+            for parent in frontier:
+                for _ in range(rng.randint(1, 4)):          # leque de bloqueados
+                    blockers = [parent] + ([rng.choice(frontier)] if rng.random() < 0.1 else [])
+                    rows.append({"pid": pid, "usuario": "app", "status": "active", "duracao_ms": 1_500.0,
+                                 "query": "SELECT * FROM contas WHERE id = ? FOR UPDATE",
+                                 "mode": "RowExclusiveLock", "relacao": "contas",
+                                 "blocked_by": sorted(set(blockers))})
+                    nxt.append(pid)
+                    pid += 1
+            frontier = nxt[:50]
+    # Um ciclo (deadlock ainda não detectado)
+    a, b = pid, pid + 1
+    rows += [{"pid": a, "blocked_by": [b]}, {"pid": b, "blocked_by": [a]}]
+    return rows[:n] + rows[-2:]
+
+
+def main(sizes):
+    print(f"{'linhas':>8} {'grafo (ms)':>11} {'árvore (ms)':>12} {'µs/linha':>9} {'raízes':>7} {'prof. máx':>9}")
+    for n in sizes:
+        rows = make_rows(n)
+        t0 = time.perf_counter()
+        graph = build_lock_graph(rows)
+        t1 = time.perf_counter()
+        graph.tree_lines(max_lines=len(rows) + 1)
+        t2 = time.perf_counter()
+        print(f"{len(rows):>8} {(t1-t0)*1000:>11.1f} {(t2-t1)*1000:>12.1f} {(t1-t0)*1e6/len(rows):>9.2f} "
+              f"{len(graph.roots):>7} {graph.max_depth:>9}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
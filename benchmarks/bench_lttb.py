@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark do LTTB: tamanho do JSON do Plotly e tempo de montagem/serialização
+do gráfico de CPU com a série inteira contra a série reduzida.
+Execute: python3 benchmarks/bench_lttb.py [10000 100000 1000000]
+"""
+
+import os, sys, time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sentinel.downsample import lttb_frame, points_for_width
+
+
+def make_series(n):
+    rng = np.random.default_rng(42)
+    cpu = np.clip(rng.normal(35, 6, n), 0, 100)
+    cpu[rng.integers(0, n, max(1, n // 5000))] = 98.0      # picos isolados
+    ts = pd.date_range("2026-01-01", periods=n, freq="s", tz="UTC")
+    return pd.DataFrame({"timestamp": ts, "cpu_usage": cpu})
+
+
+def render(df):
+    t0 = time.perf_counter()
+    fig = px.area(df, x="timestamp", y="cpu_usage", color_discrete_sequence=["#ff4466"])
+    payload = fig.to_json()
+    return time.perf_counter() - t0, len(payload)
+
+
+def main(sizes):
+    budget = points_for_width(600)
+    render(make_series(10))     # aquece o plotly.express
+    print(f"orçamento: {budget} pontos")
+    print(f"{'pontos':>9} {'JSON antes':>12} {'JSON depois':>12} {'render antes':>13} {'LTTB+render':>12} {'pico mantido':>13}")
+    for n in sizes:
+        df = make_series(n)
+        t_full, size_full = render(df)
+        t0 = time.perf_counter()
+        small = lttb_frame(df, "timestamp", "cpu_usage", budget)
+        t_lttb = time.perf_counter() - t0
+        t_small, size_small = render(small)
+        kept = small["cpu_usage"].max() == df["cpu_usage"].max()
+        print(f"{n:>9} {size_full/1024:>10.0f}KB {size_small/1024:>10.0f}KB "
+              f"{t_full*1000:>11.0f}ms {(t_lttb+t_small)*1000:>10.0f}ms {str(kept):>13}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
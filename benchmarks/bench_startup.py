@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de partida: tempo até a primeira renderização da tela de login.
+Cada rodada é um processo novo (`python -X importtime`), que renderiza o login
+com o AppTest do Streamlit; o relatório mostra o tempo de render, os imports
+mais caros e falha (código 1) se o login carregar dependências pesadas, se
+passar do orçamento ou se piorar mais que a tolerância em relação à linha de
+base gravada com --update (startup_baseline.json, versionada; sem ela a
+verificação também falha). A linha de base não é um tempo absoluto, que muda de
+máquina para máquina: é a razão entre o render do login e o de um script de
+referência (só widgets, sem nada do app), medido na mesma rodada em processos
+iguais.
+Execute: python3 benchmarks/bench_startup.py [--runs 5] [--budget-ms 1500] [--update]
+"""
+
+import argparse, json, os, statistics, subprocess, sys, time
+
+ROOT     = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+# O login não pode precisar de nada disto
+HEAVY = ("pandas", "numpy", "plotly.express", "psycopg2", "google.generativeai", "smtplib")
+
+SECRETS = {"SUPABASE_HOST": "127.0.0.1", "DB_NAME": "bench", "DB_USER": "bench", "DB_PASS": "bench"}
+
+# Mesmo tipo de tela que o login (dois campos e um botão), sem nada do app
+REFERENCE = """
+import streamlit as st
+st.title("REFERÊNCIA")
+st.text_input("usuário")
+st.text_input("senha", type="password")
+st.button("ENTRAR")
+"""
+
+
+def child(reference=False):
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    loaded_ms = 1000 * (time.perf_counter() - started)
+    if reference:
+        at = AppTest.from_string(REFERENCE, default_timeout=60)
+    else:
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    for key, value in SECRETS.items():
+        at.secrets[key] = value
+    t = time.perf_counter()
+    at.run()
+    render_ms = 1000 * (time.perf_counter() - t)
+    ok = not at.exception and len(at.text_input) >= 2
+    print(json.dumps({"streamlit_ms": loaded_ms, "render_ms": render_ms, "ok": ok,
+                      "heavy": [m for m in HEAVY if m in sys.modules]}))
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package"; só pacotes de topo
+    costs = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            name = name.strip()
+            costs[name] = costs.get(name, 0) + int(cumulative) / 1000
+    return costs
+
+
+def run_once(reference=False):
+    proc = subprocess.run([sys.executable, "-X", "importtime", __file__, "--child"] + (["--reference"] if reference else []),
+                          capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        sys.exit(f"Erro: rodada falhou\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main(runs, budget_ms, tolerance, update):
+    # Login e referência alternados, para que uma variação da máquina afete os dois
+    results, references = [], []
+    for _ in range(runs):
+        results.append(run_once())
+        references.append(run_once(reference=True))
+    render = statistics.median(r["render_ms"] for r in results)
+    loaded = statistics.median(r["streamlit_ms"] for r in results)
+    ref = statistics.median(r["render_ms"] for r in references)
+    ratio = render / ref
+    print(f"{'rodadas':<28}{runs:>10}")
+    print(f"{'import streamlit (ms)':<28}{loaded:>10.1f}")
+    print(f"{'1º render do login (ms)':<28}{render:>10.1f}")
+    print(f"{'1º render referência (ms)':<28}{ref:>10.1f}")
+    print(f"{'login / referência':<28}{ratio:>10.2f}")
+    print("\nimports mais caros (cumulativo, ms, 1ª rodada):")
+    for name, ms in sorted(results[0]["imports"].items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {name:<32}{ms:>10.1f}")
+
+    failures = []
+    if not all(r["ok"] for r in results):
+        failures.append("o login não renderizou")
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    if heavy:
+        failures.append(f"o login carregou dependências pesadas: {', '.join(heavy)}")
+    if render > budget_ms:
+        failures.append(f"render {render:.0f}ms acima do orçamento de {budget_ms:.0f}ms")
+    if not update and not os.path.exists(BASELINE):
+        failures.append(f"sem linha de base em {os.path.relpath(BASELINE, ROOT)} (grave com --update)")
+    elif not update:
+        with open(BASELINE) as f:
+            base = json.load(f)["render_ratio"]
+        print(f"{'linha de base (razão)':<28}{base:>10.2f}")
+        if ratio > base * (1 + tolerance):
+            failures.append(f"login/referência {ratio:.2f} pior que a linha de base {base:.2f} (+{tolerance:.0%})")
+    if update:
+        with open(BASELINE, "w") as f:
+            json.dump({"render_ratio": round(ratio, 2)}, f, indent=2)
+        print(f"\nLinha de base gravada em {os.path.relpath(BASELINE, ROOT)}")
+
+    for msg in failures:
+        print(f"FALHOU: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", action="store_true")
+    parser.add_argument("--reference", action="store_true", help="(com --child) renderiza o script de referência")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child(args.reference)
+    else:
+        sys.exit(main(args.runs, args.budget_ms, args.tolerance, args.update))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo por span (sentinel.tracing), desligado e ligado,
+comparado a um laço vazio. Falha (código 1) se o span desligado custar mais
+que o limite em microssegundos.
+Execute: python3 benchmarks/bench_tracing.py [1000000] [--max-disabled-us 2]
+"""
+
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sentinel import tracing
+
+
+def per_call_ns(fn, n):
+    t = time.perf_counter_ns()
+    fn(n)
+    return (time.perf_counter_ns() - t) / n
+
+
+def empty(n):
+    for _ in range(n):
+        pass
+
+
+def spans(n):
+    span = tracing.span
+    for _ in range(n):
+        with span("bench"):
+            pass
+
+
+def main(n, max_disabled_us):
+    base = per_call_ns(empty, n)
+    tracing.configure(enabled=False)
+    disabled = per_call_ns(spans, n) - base
+    tracing.configure(enabled=True)
+    enabled = per_call_ns(spans, n) - base
+    row = tracing.tracer.stats()[0]
+    print(f"{'spans':<24}{n:>12}")
+    print(f"{'desligado (ns/span)':<24}{disabled:>12.0f}")
+    print(f"{'ligado (ns/span)':<24}{enabled:>12.0f}")
+    print(f"{'p50/p99 medidos (µs)':<24}{row['p50_ms'] * 1000:>6.2f}/{row['p99_ms'] * 1000:.2f}")
+    if disabled / 1000 > max_disabled_us:
+        print(f"FALHOU: span desligado custa {disabled / 1000:.2f}µs (limite {max_disabled_us}µs)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--max-disabled-us", type=float, default=2.0)
+    args = parser.parse_args()
+    sys.exit(main(args.n, args.max_disabled_us))
@@ -0,0 +1,4 @@
+"""
+Módulos de suporte do DB Sentinel (conexões, coleta e análise de métricas).
+O app Streamlit continua em app.py.
+"""
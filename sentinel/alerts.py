@@ -0,0 +1,303 @@
+"""
+Motor de alertas sobre o fluxo de métricas.
+
+Cada regra liga uma métrica a um detector com estado O(1) por amostra:
+limite fixo, EWMA/z-score (média e variância exponenciais) ou quantil móvel
+(estimador P², sem guardar a janela). Uma regra só dispara depois de
+`for_samples` violações seguidas, resolve depois de `clear_samples` amostras
+normais e só volta a notificar depois de resolver; o cooldown segura
+reenvios de uma regra que fica oscilando. O tempo vem do
+"timestamp" das amostras, então replay() sobre o histórico se comporta igual
+à produção.
+
+Replay offline:  python -m sentinel.alerts historico.csv
+"""
+
+import math
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from sentinel.history import METRIC_COLUMNS
+
+
+# --- DETECTORES ---
+class Threshold:
+    def __init__(self, above=None, below=None):
+        self.above = above
+        self.below = below
+
+    def check(self, x):
+        if self.above is not None and x > self.above:
+            return True, f"acima de {self.above:g}"
+        if self.below is not None and x < self.below:
+            return True, f"abaixo de {self.below:g}"
+        return False, ""
+
+
+class EWMA:
+    # Só dispara para cima: métrica maior que o normal é o que importa aqui
+    def __init__(self, alpha=0.05, z=4.0, warmup=30, min_std=0.0):
+        self.alpha   = alpha
+        self.z       = z
+        self.warmup  = warmup
+        self.min_std = min_std      # piso do desvio: série quase constante não dispara por ruído
+        self.n = 0
+        self.mean = 0.0
+        self.var  = 0.0
+
+    def check(self, x):
+        breach, detail = False, ""
+        if self.n >= self.warmup:
+            std = max(math.sqrt(self.var), self.min_std)
+            score = (x - self.mean) / std if std > 0 else 0.0
+            if score > self.z:
+                breach, detail = True, f"z={score:.1f} sobre média {self.mean:.2f}"
+        # Atualiza depois de avaliar, para o pico não inflar a própria base
+        if self.n == 0:
+            self.mean = x
+        else:
+            diff = x - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.n += 1
+        return breach, detail
+
+
+class P2Quantile:
+    # Estimador P² (Jain & Chlamtac): cinco marcadores, memória e custo constantes
+    def __init__(self, p):
+        self.p = p
+        self.n = 0
+        self.q = []
+        self.pos = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.inc = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        q, pos = self.q, self.pos
+        self.n += 1
+        if self.n <= 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0], k = x, 0
+        elif x >= q[4]:
+            q[4], k = x, 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.desired[i] += self.inc[i]
+        for i in (1, 2, 3):
+            d = self.desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                qn = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if not q[i - 1] < qn < q[i + 1]:
+                    qn = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+                q[i] = qn
+                pos[i] += d
+
+    def value(self):
+        if not self.q:
+            return None
+        if self.n <= 5:
+            return self.q[min(len(self.q) - 1, int(round(self.p * (len(self.q) - 1))))]
+        return self.q[2]
+
+
+class RollingQuantile:
+    # Janela em blocos: o limite é o quantil do bloco anterior de `window` amostras,
+    # enquanto um P² novo acumula o bloco atual
+    def __init__(self, p=0.99, window=720, factor=1.0):
+        self.p       = p
+        self.window  = window
+        self.factor  = factor
+        self.current = P2Quantile(p)
+        self.limit   = None
+
+    def check(self, x):
+        breach, detail = False, ""
+        if self.limit is not None and x > self.limit * self.factor:
+            breach, detail = True, f"acima do p{self.p * 100:g} recente ({self.limit:.2f})"
+        self.current.add(x)
+        if self.current.n >= self.window:
+            self.limit = self.current.value()
+            self.current = P2Quantile(self.p)
+        return breach, detail
+
+
+# --- REGRAS E MOTOR ---
+@dataclass
+class Rule:
+    name: str
+    metric: str
+    detector: object
+    severity: str = "warning"
+    for_samples: int = 1
+    clear_samples: int = 1
+
+
+@dataclass
+class _RuleState:
+    streak: int = 0
+    ok_streak: int = 0
+    firing: bool = False
+    notified: bool = False
+    last_sent: object = None
+    last_event: dict = field(default=None)
+
+
+def default_rules(thresholds=None):
+    # Limites fixos configuráveis (secrets ALERT_THRESHOLDS) + detectores adaptativos
+    t = {"cpu_usage": 90, "avg_latency_ms": 500, "active_connections": 80, "slow_queries_count": 10,
+         **(thresholds or {})}
+    return [
+        Rule("CPU alta",              "cpu_usage",          Threshold(above=t["cpu_usage"]),          "critical", 3, 3),
+        Rule("Latência alta",         "avg_latency_ms",     Threshold(above=t["avg_latency_ms"]),     "critical", 3, 3),
+        Rule("Conexões altas",        "active_connections", Threshold(above=t["active_connections"]), "warning",  3, 3),
+        Rule("Slow queries",          "slow_queries_count", Threshold(above=t["slow_queries_count"]), "warning",  2, 3),
+        Rule("CPU anômala",           "cpu_usage",          EWMA(alpha=0.05, z=4, min_std=2.0),       "warning",  2, 12),
+        Rule("Latência anômala",      "avg_latency_ms",     EWMA(alpha=0.05, z=4, min_std=1.0),       "warning",  2, 12),
+        Rule("Conexões acima do p99", "active_connections", RollingQuantile(p=0.99, window=720),      "info",     3, 12),
+    ]
+
+
+class AlertEngine:
+    def __init__(self, rules, cooldown=600.0, notifiers=(), keep=200, skip_backlog=False):
+        unknown = {r.metric for r in rules} - set(METRIC_COLUMNS)
+        if unknown:
+            raise ValueError(f"métricas desconhecidas: {', '.join(sorted(unknown))}")
+        self.rules     = list(rules)
+        self.cooldown  = cooldown
+        self.notifiers = list(notifiers)
+        self.events    = deque(maxlen=keep)
+        self._state    = {r.name: _RuleState() for r in self.rules}
+        self._hwm      = None
+        # skip_backlog: o primeiro frame (a janela que já existia quando o processo
+        # subiu) só aquece os detectores; violações dele já foram avisadas antes do reinício
+        self.skip_backlog = skip_backlog
+        self._lock     = threading.Lock()
+        # Um worker só: notificação lenta não segura a coleta e a ordem é mantida
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-sentinel-alerts") if self.notifiers else None
+        self.sent = self.suppressed = self.notify_errors = 0
+
+    def _event(self, rule, state, ts, value, detail):
+        return {"timestamp": ts, "regra": rule.name, "metrica": rule.metric, "severidade": rule.severity,
+                "estado": state, "valor": float(value), "detalhe": detail, "notificado": False}
+
+    def observe(self, row):
+        ts = row["timestamp"]
+        out = []
+        for rule in self.rules:
+            value = row.get(rule.metric)
+            if value is None or value != value:
+                continue
+            breach, detail = rule.detector.check(float(value))
+            state = self._state[rule.name]
+            if breach:
+                state.streak += 1
+                state.ok_streak = 0
+                if state.firing or state.streak < rule.for_samples:
+                    continue
+                state.firing = True
+                event = self._event(rule, "disparou", ts, value, detail)
+                cooling = state.last_sent is not None and (ts - state.last_sent).total_seconds() < self.cooldown
+                if cooling:
+                    self.suppressed += 1
+                else:
+                    event["notificado"] = state.notified = True
+                    state.last_sent = ts
+            else:
+                state.streak = 0
+                state.ok_streak += 1
+                if not state.firing or state.ok_streak < rule.clear_samples:
+                    continue
+                state.firing = False
+                event = self._event(rule, "resolvido", ts, value, "voltou ao normal")
+                # Só avisa a resolução de quem foi avisado do disparo
+                event["notificado"], state.notified = state.notified, False
+            state.last_event = event
+            out.append(event)
+        self.events.extend(out)
+        to_send = [e for e in out if e["notificado"]]
+        if to_send and self._executor is not None:
+            self._executor.submit(self._notify, to_send)
+        return out
+
+    def _notify(self, events):
+        for notifier in self.notifiers:
+            try:
+                notifier(events)
+                self.sent += 1
+            except Exception:
+                self.notify_errors += 1
+
+    def process_frame(self, frame):
+        # Só amostras mais novas que a última vista, em ordem cronológica
+        if frame is None or frame.empty:
+            return []
+        with self._lock:
+            new = frame if self._hwm is None else frame[frame["timestamp"] > self._hwm]
+            if new.empty:
+                return []
+            new = new.sort_values("timestamp")
+            first, self._hwm = self._hwm is None, new["timestamp"].iloc[-1]
+            if first and self.skip_backlog:
+                for rule in self.rules:
+                    for value in new[rule.metric].dropna():
+                        rule.detector.check(float(value))
+                return []
+            out = []
+            for row in new.to_dict("records"):
+                out.extend(self.observe(row))
+            return out
+
+    def active(self):
+        with self._lock:
+            return [s.last_event for s in self._state.values() if s.firing]
+
+    def stats(self):
+        return {"rules": len(self.rules), "firing": sum(s.firing for s in self._state.values()),
+                "events": len(self.events), "sent": self.sent, "suppressed": self.suppressed,
+                "notify_errors": self.notify_errors}
+
+
+def replay(frame, rules=None, cooldown=600.0):
+    # Roda o motor sobre linhas históricas, sem notificar; devolve os eventos
+    engine = AlertEngine(rules if rules is not None else default_rules(), cooldown)
+    events = engine.process_frame(frame)
+    return pd.DataFrame(events, columns=["timestamp", "regra", "metrica", "severidade",
+                                         "estado", "valor", "detalhe", "notificado"])
+
+
+def main(argv=None):
+    # CSV exportado de db_metrics_history (ex.: \copy ... TO 'historico.csv' CSV HEADER)
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("uso: python -m sentinel.alerts historico.csv [cooldown_s]")
+        return 2
+    frame = pd.read_csv(argv[0])
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True, format="mixed")
+    events = replay(frame, cooldown=float(argv[1]) if len(argv) > 1 else 600.0)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(events.to_string(index=False) if not events.empty else "Nenhum alerta.")
+        if not events.empty:
+            print()
+            print(events.groupby(["regra", "estado"]).size().unstack(fill_value=0))
+    print(f"\n{len(frame)} amostras, {int(events['notificado'].sum()) if not events.empty else 0} notificações")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Cache em memória com TTL e stale-while-revalidate.
+
+Dentro do TTL a leitura é um acerto direto. Depois dele (até `max_stale`)
+o valor antigo é servido na hora e uma única atualização roda em segundo
+plano; sem valor algum, a carga é síncrona, mas sessões concorrentes pedindo
+a mesma chave esperam a mesma carga em vez de repetir a consulta.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+Entry = namedtuple("Entry", "value loaded_at version")
+
+_WS = re.compile(r"\s+")
+
+
+def cache_key(sql, params=()):
+    # Normaliza espaços para que a mesma consulta formatada diferente caia na mesma chave
+    return (_WS.sub(" ", sql).strip(), tuple(params))
+
+
+class SWRCache:
+    def __init__(self, ttl=5.0, max_stale=300.0, max_entries=256, max_workers=4):
+        self.ttl         = ttl
+        self.max_stale   = max_stale
+        self.max_entries = max_entries
+        self._entries    = OrderedDict()
+        self._inflight   = {}
+        self._lock       = threading.Lock()
+        self._executor   = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-sentinel-cache")
+        self._version    = 0
+        self._hits = self._stale = self._misses = self._refreshes = self._errors = 0
+
+    def get(self, key, loader, ttl=None, timeout=None):
+        return self.get_entry(key, loader, ttl, timeout).value
+
+    def get_entry(self, key, loader, ttl=None, timeout=None):
+        # timeout: quanto esperar por uma carga em andamento (TimeoutError depois)
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry.loaded_at
+                self._entries.move_to_end(key)
+                if age < ttl:
+                    self._hits += 1
+                    return entry
+                if age < ttl + self.max_stale:
+                    self._stale += 1
+                    self._refresh_locked(key, loader)
+                    return entry
+            self._misses += 1
+            future, owner = self._claim_locked(key)
+        if owner:
+            self._load(key, loader, future)
+        return future.result(timeout)
+
+    def put(self, key, value):
+        with self._lock:
+            return self._store_locked(key, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._stale + self._misses
+            return {
+                "entries":   len(self._entries),
+                "hits":      self._hits,
+                "stale":     self._stale,
+                "misses":    self._misses,
+                "refreshes": self._refreshes,
+                "errors":    self._errors,
+                "hit_ratio": (self._hits + self._stale) / lookups if lookups else 0.0,
+            }
+
+    # --- INTERNOS (chamados com self._lock) ---
+    def _claim_locked(self, key):
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        return future, True
+
+    def _refresh_locked(self, key, loader):
+        future, owner = self._claim_locked(key)
+        if owner:
+            self._refreshes += 1
+            self._executor.submit(self._load, key, loader, future)
+
+    def _store_locked(self, key, value):
+        self._version += 1
+        entry = Entry(value, time.monotonic(), self._version)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _load(self, key, loader, future):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._errors += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            entry = self._store_locked(key, value)
+            self._inflight.pop(key, None)
+        future.set_result(entry)
@@ -0,0 +1,103 @@
+"""
+Coletor de métricas em segundo plano.
+
+Uma única thread por processo consulta o banco a cada `interval` segundos e
+publica um Snapshot imutável. Os reruns do Streamlit só leem o último
+snapshot, então clicar em botões ou trocar de aba não gera novas consultas.
+Com `on_publish` cada snapshot também é empurrado para um cache externo.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    taken_at: float
+    history: pd.DataFrame
+    tasks: pd.DataFrame
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+class MetricsCollector:
+    def __init__(self, fetch, interval=5.0, on_publish=None):
+        self._fetch    = fetch          # () -> (history_df, tasks_df)
+        self.interval  = interval
+        self._on_publish = on_publish   # ex.: SWRCache.put, para aquecer o cache
+        self._snapshot = None
+        self._version  = 0
+        self._lock     = threading.Lock()
+        self._ready    = threading.Event()
+        self._wake     = threading.Event()
+        self._stop     = threading.Event()
+        self._thread   = None
+        self.publish_errors = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-sentinel-collector", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def refresh(self):
+        # Antecipa a próxima coleta (ex.: botão de atualizar)
+        self._wake.set()
+
+    def latest(self):
+        return self._snapshot
+
+    def wait_first(self, timeout=None):
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    def poll_once(self):
+        started = time.monotonic()
+        previous = self._snapshot
+        try:
+            history, tasks = self._fetch()
+            error = None
+        except Exception as e:
+            # Mantém os últimos dados bons e registra o erro
+            history = previous.history if previous else pd.DataFrame()
+            tasks   = previous.tasks if previous else pd.DataFrame()
+            error   = str(e) or e.__class__.__name__
+        with self._lock:
+            self._version += 1
+            snapshot = Snapshot(
+                version=self._version, taken_at=time.time(),
+                history=history, tasks=tasks, error=error,
+                duration_ms=1000 * (time.monotonic() - started),
+            )
+            self._snapshot = snapshot
+        self._ready.set()
+        if self._on_publish is not None:
+            try:
+                self._on_publish(snapshot)
+            except Exception:
+                # Um cache com problema não pode matar a thread: o snapshot já foi publicado
+                self.publish_errors += 1
+                log.exception("on_publish falhou no snapshot %d", snapshot.version)
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.poll_once()
+            self._wake.wait(self.interval)
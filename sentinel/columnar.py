@@ -0,0 +1,85 @@
+"""
+Leitura colunar de resultados psycopg2 direto para DataFrame.
+
+Em vez de RealDictCursor (um dict por linha, colunas inferidas de novo pelo
+pandas), lê tuplas e monta cada coluna já tipada a partir de
+cursor.description. copy_frame usa COPY ... TO STDOUT em CSV para janelas
+muito grandes, onde o parser do pandas é mais rápido que criar tuplas.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from sentinel import tracing
+
+# OIDs dos tipos do Postgres (pg_type)
+_INT_OIDS   = {20, 21, 23}            # int8, int2, int4
+_FLOAT_OIDS = {700, 701, 1700}        # float4, float8, numeric
+_BOOL_OIDS  = {16}
+_TS_OID     = 1114                    # timestamp
+_TSTZ_OID   = 1184                    # timestamptz
+
+
+def _column(values, oid):
+    if oid in _FLOAT_OIDS:
+        # None vira NaN; Decimal é convertido para float
+        return np.array(values, dtype="float64")
+    if oid in _INT_OIDS:
+        if None in values:
+            return pd.array(values, dtype="Int64")
+        return np.array(values, dtype="int64")
+    if oid in _BOOL_OIDS:
+        if None in values:
+            return pd.array(values, dtype="boolean")
+        return np.array(values, dtype=bool)
+    if oid == _TS_OID:
+        return pd.to_datetime(values)
+    if oid == _TSTZ_OID:
+        # Com horário de verão no TimeZone da sessão a janela pode ter dois offsets
+        # (-03 e -02, p.ex.): sem utc=True o pandas recusa a mistura
+        ts = pd.to_datetime(values, utc=True)
+        tzinfos = {v.tzinfo for v in values if v is not None}
+        if len(tzinfos) == 1:
+            # Um offset só: mantém o fuso em que a sessão devolveu os valores
+            ts = ts.tz_convert(tzinfos.pop())
+        return ts
+    return np.array(values, dtype=object)
+
+
+def frame_from_rows(rows, description):
+    names = [d[0] for d in description]
+    if not rows:
+        return pd.DataFrame(columns=names)
+    # Uma lista por coluna: mais barato que zip(*rows), que cria uma tupla gigante por coluna
+    data = {}
+    for i, (name, d) in enumerate(zip(names, description)):
+        data[name] = _column([r[i] for r in rows], d[1])
+    return pd.DataFrame(data, columns=names)
+
+
+def frame_from_cursor(cur):
+    return frame_from_rows(cur.fetchall(), cur.description)
+
+
+def read_frame(conn, sql, params=None):
+    with conn.cursor() as cur:
+        with tracing.span("db.query"):
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        with tracing.span("frame.build"):
+            return frame_from_rows(rows, cur.description)
+
+
+def copy_frame(conn, sql, params=None, parse_dates=None):
+    with conn.cursor() as cur:
+        query = cur.mogrify(sql.strip().rstrip(";"), params).decode()
+        buf = io.StringIO()
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", buf)
+    buf.seek(0)
+    frame = pd.read_csv(buf)
+    for name in parse_dates or ():
+        # timestamptz em CSV traz o offset de cada linha, que muda no horário de verão
+        frame[name] = pd.to_datetime(frame[name], utc=True)
+    return frame
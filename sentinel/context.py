@@ -0,0 +1,175 @@
+"""
+Contexto do diagnóstico: consultas mais caras, inchaço de tabelas, uso de
+índices e tendência recente das métricas.
+
+Tudo vem de uma única consulta (um round-trip) que devolve um JSON. Depois as
+seções são priorizadas e cortadas para caber num orçamento fixo de tokens,
+para que o tamanho do prompt e a latência do modelo sejam previsíveis. Quem
+chama pode juntar ao dict a chave "plans" (linhas de sentinel.plans), que
+entra logo depois da tendência.
+"""
+
+from psycopg2 import errors
+
+from sentinel.pool import read_only
+
+STATEMENTS_SQL = """
+    'top_total', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT queryid, left(regexp_replace(query, '\\s+', ' ', 'g'), 300) AS query, calls,
+               round(total_exec_time::numeric, 1) AS total_ms, round(mean_exec_time::numeric, 2) AS mean_ms,
+               rows, shared_blks_hit, shared_blks_read
+        FROM pg_stat_statements ORDER BY total_exec_time DESC LIMIT %(top_n)s) t),
+    'top_mean', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT queryid, left(regexp_replace(query, '\\s+', ' ', 'g'), 300) AS query, calls,
+               round(total_exec_time::numeric, 1) AS total_ms, round(mean_exec_time::numeric, 2) AS mean_ms,
+               rows, shared_blks_hit, shared_blks_read
+        FROM pg_stat_statements WHERE calls >= 5 ORDER BY mean_exec_time DESC LIMIT %(top_n)s) t),
+"""
+
+CONTEXT_SQL = """
+SELECT json_build_object(
+    {statements}
+    'bloat', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT schemaname || '.' || relname AS tabela, n_live_tup, n_dead_tup,
+               round(100.0 * n_dead_tup / nullif(n_live_tup + n_dead_tup, 0), 1) AS dead_pct,
+               last_autovacuum
+        FROM pg_stat_user_tables WHERE n_dead_tup > 1000
+        ORDER BY n_dead_tup DESC LIMIT %(top_n)s) t),
+    'seq_scans', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT schemaname || '.' || relname AS tabela, seq_scan, seq_tup_read, idx_scan, n_live_tup
+        FROM pg_stat_user_tables WHERE seq_scan > 0
+        ORDER BY seq_tup_read DESC LIMIT %(top_n)s) t),
+    'unused_indexes', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT schemaname || '.' || indexrelname AS indice, relname AS tabela,
+               pg_relation_size(indexrelid) AS bytes
+        FROM pg_stat_user_indexes WHERE idx_scan = 0
+        ORDER BY pg_relation_size(indexrelid) DESC LIMIT %(top_n)s) t),
+    'trend', (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT "timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count
+        FROM db_metrics_history ORDER BY "timestamp" DESC LIMIT %(trend_rows)s) t)
+)
+"""
+
+# Aproximação usual: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+# Os números entram no prompt em faixas (como em diagnosis.normalize_telemetry):
+# com valores exatos o prompt, e a chave do cache do diagnóstico, mudaria a cada amostra
+TREND_STEPS = {"cpu_usage": 5, "active_connections": 5, "slow_queries_count": 1}
+
+
+def _trend_bucket(col, value):
+    step = TREND_STEPS.get(col) or (1 if value < 20 else 10)   # latência: 1ms abaixo de 20ms, senão 10ms
+    return f"{round(value / step) * step:.0f}"
+
+
+def coarse(value, digits=2):
+    # Contadores cumulativos (chamadas, blocos, linhas) com 2 algarismos significativos
+    value = float(value or 0)
+    if value == 0:
+        return "0"
+    return f"{float(f'{value:.{digits}g}'):,.0f}" if abs(value) >= 10 ** (digits - 1) else f"{value:.{digits}g}"
+
+
+def _query_context(conn, statements, params, timeout_ms):
+    if timeout_ms is None:
+        with conn.cursor() as cur:
+            cur.execute(CONTEXT_SQL.format(statements=statements), params)
+            return cur.fetchone()[0]
+    with read_only(conn, timeout_ms) as cur:
+        cur.execute(CONTEXT_SQL.format(statements=statements), params)
+        return cur.fetchone()[0]
+
+
+def fetch_context(conn, top_n=10, trend_rows=30, timeout_ms=None):
+    # timeout_ms: statement_timeout da consulta (ex.: o que resta do prazo do job)
+    params = {"top_n": top_n, "trend_rows": trend_rows}
+    try:
+        ctx = _query_context(conn, STATEMENTS_SQL, params, timeout_ms)
+    except (errors.UndefinedTable, errors.UndefinedColumn, errors.ObjectNotInPrerequisiteState):
+        # Sem pg_stat_statements (ou versão antiga): segue sem as consultas
+        if not conn.autocommit:
+            conn.rollback()
+        ctx = _query_context(conn, "", params, timeout_ms)
+    ctx.setdefault("top_total", [])
+    ctx.setdefault("top_mean", [])
+    return ctx
+
+
+def _trend_lines(trend):
+    if not trend:
+        return []
+    lines = []
+    for col, unit in (("cpu_usage", "%"), ("active_connections", ""), ("avg_latency_ms", "ms"), ("slow_queries_count", "")):
+        values = [float(r[col]) for r in trend if r.get(col) is not None]
+        if not values:
+            continue
+        newest, oldest = values[0], values[-1]
+        arrow = "↑" if newest > oldest * 1.1 else "↓" if newest < oldest * 0.9 else "→"
+        b = lambda v: _trend_bucket(col, v)
+        lines.append(f"- {col}: atual {b(newest)}{unit}, min {b(min(values))}, "
+                     f"média {b(sum(values)/len(values))}, max {b(max(values))} {arrow} ({len(values)} amostras)")
+    return lines
+
+
+def _statement_lines(ctx):
+    # Junta as duas listas por queryid; ordena pela fatia do tempo total e depois pelo tempo médio
+    merged = {}
+    for row in ctx["top_total"] + ctx["top_mean"]:
+        merged.setdefault(row["queryid"], row)
+    total = sum(float(r["total_ms"]) for r in merged.values()) or 1.0
+    ranked = sorted(merged.values(), key=lambda r: (float(r["total_ms"]) / total, float(r["mean_ms"])), reverse=True)
+    return [f"- {coarse(100 * float(r['total_ms']) / total)}% do tempo | {coarse(r['calls'])} chamadas | "
+            f"média {coarse(r['mean_ms'])}ms | leitura disco {coarse(r['shared_blks_read'])} blocos: {r['query']}"
+            for r in ranked]
+
+
+def _sections(ctx):
+    yield "TENDÊNCIA RECENTE", _trend_lines(ctx.get("trend"))
+    # Linhas prontas de sentinel.plans.plan_lines (EXPLAIN das consultas mais lentas)
+    yield "PLANOS DE EXECUÇÃO (EXPLAIN)", ctx.get("plans", [])
+    yield "CONSULTAS MAIS CARAS (pg_stat_statements)", _statement_lines(ctx)
+    yield "TABELAS COM LINHAS MORTAS", [
+        f"- {r['tabela']}: {coarse(r['n_dead_tup'])} mortas ({coarse(r['dead_pct'])}%), último autovacuum {r['last_autovacuum'] or 'nunca'}"
+        for r in ctx.get("bloat", [])]
+    yield "SEQ SCANS", [
+        f"- {r['tabela']}: {coarse(r['seq_scan'])} seq scans lendo {coarse(r['seq_tup_read'])} linhas, "
+        f"{coarse(r['idx_scan'])} idx scans, {coarse(r['n_live_tup'])} linhas"
+        for r in ctx.get("seq_scans", [])]
+    yield "ÍNDICES NUNCA USADOS", [
+        f"- {r['indice']} em {r['tabela']}: {coarse(int(r['bytes']) // 1024)} KB"
+        for r in ctx.get("unused_indexes", [])]
+
+
+def render_context(ctx, token_budget=1500):
+    # Cada seção primeiro recebe uma fatia igual do orçamento; a sobra vai para
+    # as seções em ordem de prioridade. Linhas só entram inteiras.
+    sections = [(f"\n{title}:", lines) for title, lines in _sections(ctx) if lines]
+    if not sections:
+        return ""
+    remaining = token_budget * CHARS_PER_TOKEN
+    taken = [0] * len(sections)
+
+    def fill(i, allowance):
+        nonlocal remaining
+        header, lines = sections[i]
+        allowance = min(allowance, remaining)
+        spent = 0 if taken[i] else len(header) + 1
+        while taken[i] < len(lines) and spent + len(lines[taken[i]]) + 1 <= allowance:
+            spent += len(lines[taken[i]]) + 1
+            taken[i] += 1
+        if taken[i]:
+            remaining -= spent
+
+    share = remaining // len(sections)
+    for i in range(len(sections)):
+        fill(i, share)
+    for i in range(len(sections)):
+        fill(i, remaining)
+
+    out = []
+    for (header, lines), n in zip(sections, taken):
+        if n:
+            out.append(header)
+            out.extend(lines[:n])
+    return "\n".join(out).strip()
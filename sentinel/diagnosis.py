@@ -0,0 +1,229 @@
+"""
+Diagnóstico com IA: streaming, cache e coalescência de pedidos iguais.
+
+A telemetria é normalizada em faixas antes de virar prompt, então leituras
+quase iguais geram o mesmo prompt e a mesma chave de cache. Pedidos
+simultâneos com a mesma chave acompanham uma única chamada ao modelo,
+recebendo os trechos da resposta conforme chegam. Um semáforo limita quantas
+chamadas ao modelo rodam ao mesmo tempo, e a geração para (fechando o stream)
+quando todos os leitores desistem: cancelamento ou prazo esgotado. diagnosis_job
+adapta o streaming para rodar como job em sentinel.jobs.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from sentinel import tracing
+
+PROMPT = """Você é um DBA Sênior especializado em PostgreSQL e Supabase.
+Analise os dados reais de telemetria e forneça um relatório técnico em português:
+
+PROJETO: {project}
+CPU: {cpu_usage}% | Conexões: {active_connections} | Latência: {avg_latency_ms}ms | Slow Queries: {slow_queries_count}
+{context}
+Forneça:
+1. 🏥 DIAGNÓSTICO DE SAÚDE
+2. ⚠️ GARGALOS IDENTIFICADOS
+3. 🔧 COMANDOS SQL DE TUNING (com blocos de código)
+4. 📊 SCORE DE SAÚDE (0-100) com tabela
+
+Seja técnico e direto."""
+
+
+def _step(value, step):
+    return round(float(value or 0) / step) * step
+
+
+def normalize_telemetry(latest):
+    # Faixas largas o bastante para que ruído de amostragem não mude o diagnóstico
+    latency = float(latest.get('avg_latency_ms') or 0)
+    return {
+        "cpu_usage":          int(_step(latest.get('cpu_usage'), 5)),
+        "active_connections": int(_step(latest.get('active_connections'), 5)),
+        "avg_latency_ms":     _step(latency, 1 if latency < 20 else 10),
+        "slow_queries_count": int(latest.get('slow_queries_count') or 0),
+    }
+
+
+def build_prompt(telemetry, project, context=""):
+    context = f"\nCONTEXTO COLETADO DO BANCO:\n{context}\n" if context else ""
+    return PROMPT.format(project=project, context=context, **telemetry)
+
+
+def prompt_key(prompt):
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+class GenerationAbandoned(Exception):
+    pass
+
+
+class _Flight:
+    # Uma geração em andamento; vários leitores acompanham os mesmos trechos
+    def __init__(self):
+        self.chunks    = []
+        self.done      = False
+        self.error     = None
+        self.cond      = threading.Condition()
+        self.followers = 0
+        self.abandoned = threading.Event()   # nenhum leitor restante: a geração pode parar
+
+    def join(self):
+        with self.cond:
+            self.followers += 1
+
+    def leave(self):
+        with self.cond:
+            self.followers -= 1
+            if self.followers <= 0 and not self.done:
+                self.abandoned.set()
+
+    def push(self, text):
+        with self.cond:
+            self.chunks.append(text)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.done  = True
+            self.error = error
+            self.cond.notify_all()
+
+    def follow(self, deadline=None, stop=None):
+        # `deadline` (time.monotonic) e `stop` (Event) permitem abandonar a espera;
+        # o leitor já foi contado em join() e sai ao terminar, por qualquer motivo
+        try:
+            yield from self._follow(deadline, stop)
+        finally:
+            self.leave()
+
+    def _follow(self, deadline, stop):
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.chunks) and not self.done:
+                    if stop is not None and stop.is_set():
+                        return
+                    wait = 0.25
+                    if deadline is not None:
+                        wait = min(wait, deadline - time.monotonic())
+                        if wait <= 0:
+                            raise TimeoutError("tempo esgotado aguardando o modelo")
+                    self.cond.wait(wait)
+                new, done, error = self.chunks[i:], self.done, self.error
+            yield from new
+            i += len(new)
+            if done and i >= len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class DiagnosisService:
+    def __init__(self, model, project, ttl=300.0, max_entries=128, max_concurrent=2):
+        self.model       = model
+        self.project     = project
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self._cache    = OrderedDict()  # chave -> (texto, expira_em)
+        self._inflight = {}
+        self._lock     = threading.Lock()
+        self._slots    = threading.BoundedSemaphore(max_concurrent)   # chamadas simultâneas ao modelo
+        self.calls = self.hits = self.coalesced = self.abandoned = 0
+
+    def stream(self, latest, context="", deadline=None, stop=None):
+        prompt = build_prompt(normalize_telemetry(latest), self.project, context)
+        key = prompt_key(prompt)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                self.hits += 1
+                return iter([cached[0]])
+            flight = self._inflight.get(key)
+            if flight is None or flight.abandoned.is_set():
+                # Uma geração abandonada está parando: começa outra
+                flight = self._inflight[key] = _Flight()
+                flight.join()
+                self.calls += 1
+                threading.Thread(target=self._generate, args=(key, prompt, flight),
+                                 name="db-sentinel-diagnosis", daemon=True).start()
+            else:
+                self.coalesced += 1
+                flight.join()
+        return flight.follow(deadline, stop)
+
+    def _acquire_slot(self, flight):
+        # Espera vaga no semáforo, mas desiste se todos os leitores já foram embora
+        while not self._slots.acquire(timeout=0.25):
+            if flight.abandoned.is_set():
+                return False
+        return True
+
+    def _generate(self, key, prompt, flight):
+        parts = []
+        started = time.perf_counter()
+        if not self._acquire_slot(flight):
+            self._fail(key, flight, GenerationAbandoned("diagnóstico abandonado antes de começar"))
+            return
+        stream = None
+        try:
+            with tracing.span("llm.generate"):
+                stream = self.model.generate_content(prompt, stream=True)
+                for chunk in stream:
+                    if flight.abandoned.is_set():
+                        raise GenerationAbandoned("diagnóstico cancelado ou sem prazo")
+                    text = chunk.text
+                    if text:
+                        if not parts and tracing.tracer.enabled:
+                            tracing.tracer.record("llm.first_chunk", 1000 * (time.perf_counter() - started))
+                        parts.append(text)
+                        flight.push(text)
+        except Exception as e:
+            self._fail(key, flight, e)
+            return
+        finally:
+            # Fecha o stream (para de consumir/cobrar tokens) e libera a vaga
+            close = getattr(stream, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+            self._slots.release()
+        with self._lock:
+            self._cache[key] = ("".join(parts), time.monotonic() + self.ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._drop_locked(key, flight)
+        flight.finish()
+
+    def _drop_locked(self, key, flight):
+        # Só remove se a chave ainda aponta para esta geração (pode já haver outra)
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def _fail(self, key, flight, error):
+        with self._lock:
+            self._drop_locked(key, flight)
+            if isinstance(error, GenerationAbandoned):
+                self.abandoned += 1
+        flight.finish(error)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "hits": self.hits, "coalesced": self.coalesced, "abandoned": self.abandoned,
+                    "cached": len(self._cache), "inflight": len(self._inflight)}
+
+
+def diagnosis_job(service, latest, context_fn=None):
+    # Função para JobRunner.submit: coleta o contexto (se houver) e acumula os
+    # trechos no job até terminar, ser cancelado ou estourar o prazo. context_fn
+    # recebe o prazo do job e limita as próprias consultas a ele
+    def run(job):
+        context = context_fn(job.deadline) if context_fn is not None else ""
+        for chunk in service.stream(latest, context, deadline=job.deadline, stop=job.cancel_event):
+            job.append(chunk)
+    return run
@@ -0,0 +1,55 @@
+"""
+Redução de pontos Largest-Triangle-Three-Buckets (LTTB) antes do Plotly.
+
+Mantém o formato visual da série (inclusive picos de CPU) com um número de
+pontos proporcional à largura do gráfico em pixels. O laço é por balde; a
+escolha do ponto dentro de cada balde é vetorizada com NumPy.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Mais de um ponto por pixel não muda nada na tela
+POINTS_PER_PIXEL = 1
+
+
+def points_for_width(width_px, points_per_pixel=POINTS_PER_PIXEL):
+    return max(3, int(width_px * points_per_pixel))
+
+
+def lttb_indices(x, y, n_out):
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Limites dos n_out-2 baldes internos (primeiro e último ponto ficam fixos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Média de cada balde, usada como terceiro vértice do triângulo
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.nanargmax(area)) if not np.all(np.isnan(area)) else lo
+        out[i + 1] = a
+    return out
+
+
+def lttb_frame(df, x, y, n_out):
+    if len(df) <= n_out:
+        return df
+    xs = df[x]
+    if pd.api.types.is_datetime64_any_dtype(xs.dtype):
+        xs = xs.astype("int64")
+    return df.iloc[lttb_indices(xs.to_numpy(), df[y].to_numpy(dtype="float64", na_value=np.nan), n_out)]
@@ -0,0 +1,467 @@
+"""
+Driver falso com a parte da interface do psycopg2 que o dashboard usa.
+
+Responde às consultas do app (janela ao vivo, baldes do histórico, processos,
+fingerprints, durações, bloqueios, contexto do diagnóstico e EXPLAIN) com dados
+sintéticos e determinísticos: as métricas são uma função do tempo, então a
+janela ao vivo ganha uma amostra nova a cada SAMPLE_S segundos, e as sessões
+de pg_stat_activity (com algumas cadeias de lock) são sorteadas com semente
+fixa. Cada execute() é contado por tipo de consulta e por thread, e pode
+esperar uma latência simulada de rede. Ative com FAKE_DB = true nos secrets;
+os benchmarks de carga usam configure() e counts().
+
+seed() grava a mesma série em um Postgres de verdade (db_metrics_history).
+"""
+
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import execute_values
+
+from sentinel import history, processes
+
+SAMPLE_S = 5
+EPOCH    = datetime(2000, 1, 1, tzinfo=timezone.utc)   # origem do date_bin
+
+# OIDs usados em cursor.description (ver sentinel.columnar)
+INT8, INT4, FLOAT8, TEXT, TIMESTAMPTZ, INT4_ARRAY, JSON = 20, 23, 701, 25, 1184, 1007, 114
+
+USERS   = ["app", "app", "app", "relatorios", "etl", "postgres"]
+STATES  = [("active", 30), ("idle", 45), ("idle in transaction", 15),
+           ("idle in transaction (aborted)", 2), ("fastpath function call", 1), ("disabled", 1)]
+WAITS   = [(None, None), ("Client", "ClientRead"), ("IO", "DataFileRead"), ("LWLock", "WALWrite"), ("Activity", "WalWriterMain")]
+QUERIES = [
+    "SELECT * FROM pedidos WHERE cliente_id = {n} AND status = 'aberto'",
+    "SELECT id, nome FROM clientes WHERE id IN ({n}, {m}, {k})",
+    "UPDATE estoque SET quantidade = quantidade - {m} WHERE produto_id = {n}",
+    "INSERT INTO eventos (tipo, payload) VALUES ('clique', '{{\"id\": {n}}}')",
+    "SELECT count(*) FROM pedidos p JOIN itens i ON i.pedido_id = p.id WHERE p.criado_em > now() - interval '{m} days'",
+    "/* relatorio */ SELECT date_trunc('hour', criado_em), sum(total) FROM pedidos GROUP BY 1",
+    "DELETE FROM sessoes WHERE expira_em < now() -- limpeza",
+]
+
+# Para os planos (sentinel.plans): tamanho das tabelas e work_mem de 4MB
+RELTUPLES = {"pedidos": 2_000_000, "itens": 15_000_000, "clientes": 80_000, "estoque": 5_000,
+             "eventos": 900_000, "sessoes": 20_000}
+WORK_MEM = 4 << 20
+TX_COMMANDS = ("BEGIN", "SET LOCAL", "PREPARE", "DEALLOCATE", "ROLLBACK", "COMMIT")
+
+
+def _noise(t, salt):
+    # Pseudo-aleatório vetorizado e estável: o mesmo instante sempre dá o mesmo valor
+    x = np.sin(t * 12.9898 + salt * 78.233) * 43758.5453
+    return x - np.floor(x)
+
+
+def metric_frame(timestamps):
+    # timestamps: np.ndarray de segundos desde a época Unix (múltiplos de SAMPLE_S)
+    t = np.asarray(timestamps, dtype="float64")
+    day = 2 * np.pi * t / 86400
+    cpu = 35 + 20 * np.sin(day) + 10 * np.sin(2 * np.pi * t / 900) + 8 * _noise(t, 1)
+    spike = _noise(np.floor(t / 600), 5) > 0.97          # ~3% das janelas de 10min com pico
+    cpu = np.clip(cpu + spike * 30, 0, 100)
+    conns = np.round(40 + 25 * np.sin(day + 0.5) + 10 * _noise(t, 2)).astype("int64")
+    latency = 4 + cpu / 12 + 6 * _noise(t, 3) ** 4 + spike * 40
+    slow = np.floor(_noise(t, 4) ** 3 * 6 + spike * 8).astype("int64")
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(t, unit="s", utc=True),
+        "cpu_usage": cpu, "active_connections": conns,
+        "avg_latency_ms": latency, "slow_queries_count": slow,
+    })
+
+
+def _last_sample(now=None):
+    now = time.time() if now is None else now
+    return int(now) // SAMPLE_S * SAMPLE_S
+
+
+def _make_sessions(n, seed, now):
+    rng = random.Random(seed)
+    sessions = []
+    for i in range(n):
+        state = rng.choices([s for s, _ in STATES], [w for _, w in STATES])[0]
+        wait_type, wait = rng.choice(WAITS) if state != "idle" else ("Client", "ClientRead")
+        age = rng.expovariate(1 / (0.4 if state == "active" else 60))
+        sessions.append({
+            "pid": 1000 + i, "usename": rng.choice(USERS), "state": state,
+            "backend_type": "client backend", "wait_event_type": wait_type, "wait_event": wait,
+            "query": rng.choice(QUERIES).format(n=rng.randint(1, 9999), m=rng.randint(1, 90), k=rng.randint(1, 9999)),
+            "query_start": now - timedelta(seconds=age), "blocked_by": [],
+        })
+    # Cadeias de lock: ~3% das sessões ativas esperam outra sessão
+    active = [s for s in sessions if s["state"] == "active"]
+    for s in active[: max(1, len(active) // 30)]:
+        blocker = rng.choice(sessions)
+        if blocker is not s:
+            s["wait_event_type"], s["wait_event"] = "Lock", "transactionid"
+            s["blocked_by"] = [blocker["pid"]]
+    return sessions
+
+
+class FakeDatabase:
+    def __init__(self, sessions=300, latency_ms=0.0, seed=42):
+        self.latency_s = latency_ms / 1000
+        self.sessions  = _make_sessions(sessions, seed, datetime.now(timezone.utc))
+        self._counts   = Counter()
+        self._lock     = threading.Lock()
+
+    # --- CONTAGEM ---
+    def count(self, kind):
+        # Threads de pool se chamam "prefixo_N": agrupa pelo prefixo
+        group = re.sub(r"_\d+$", "", threading.current_thread().name)
+        with self._lock:
+            self._counts[(kind, group)] += 1
+
+    def counts(self):
+        with self._lock:
+            return Counter(self._counts)
+
+    def reset_counts(self):
+        with self._lock:
+            self._counts.clear()
+
+    # --- CONSULTAS ---
+    def execute(self, sql, params):
+        kind, handler = self._route(sql)
+        self.count(kind)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        # Parâmetros posicionais viram lista (os handlers consomem com pop); nomeados ficam dict
+        return handler(sql, params if isinstance(params, dict) else list(params or ()))
+
+    def _route(self, sql):
+        head = sql.lstrip()
+        if sql.strip() == "SELECT 1":
+            return "ping", lambda sql, params: ([(1,)], [("?column?", INT4)])
+        if head.startswith(TX_COMMANDS):
+            return "tx", lambda sql, params: ([], None)
+        if head.startswith("EXPLAIN"):
+            return "explain", self._explain
+        if "pg_size_bytes" in sql:
+            return "settings", lambda sql, params: ([(WORK_MEM,)], [("pg_size_bytes", INT8)])
+        if "FROM pg_class" in sql:
+            return "reltuples", self._reltuples
+        if "json_build_object" in sql:
+            return "context", self._context
+        if "FROM pg_stat_statements" in sql:
+            return "statements", self._statements
+        if "pg_blocking_pids" in sql:
+            return "locks", self._locks
+        if "GROUP BY fp" in sql:
+            return "fingerprints", self._fingerprints
+        if "sort_key" in sql:
+            return "processes", self._processes
+        if "FROM pg_stat_activity" in sql:
+            return "durations", self._durations
+        if "date_bin" in sql:
+            return "history", self._history
+        if "max(bucket)" in sql:
+            return "freshness", self._freshness
+        if "FROM db_metrics_history" in sql:
+            return "live", self._live
+        raise psycopg2.NotSupportedError(f"fake_db: consulta não suportada: {' '.join(sql.split())[:80]}")
+
+    def _live(self, sql, params):
+        since, limit = params
+        last = _last_sample()
+        frame = metric_frame(np.arange(last, last - SAMPLE_S * int(limit), -SAMPLE_S))
+        if since != "-infinity":
+            frame = frame[frame["timestamp"] > pd.Timestamp(since)]
+        cols = ("timestamp",) + history.METRIC_COLUMNS
+        desc = [("timestamp", TIMESTAMPTZ), ("cpu_usage", FLOAT8), ("active_connections", INT4),
+                ("avg_latency_ms", FLOAT8), ("slow_queries_count", INT4)]
+        return list(frame[list(cols)].itertuples(index=False, name=None)), desc
+
+    def _freshness(self, sql, params):
+        # Rollups sempre em dia: o último balde de 1m contém a última amostra
+        last = pd.Timestamp(_last_sample(), unit="s", tz="UTC").to_pydatetime()
+        return [(last.replace(second=0), last)], [("max", TIMESTAMPTZ), ("max", TIMESTAMPTZ)]
+
+    def _history(self, sql, params):
+        bucket, span = params[:2]
+        # Rollups e amostras brutas dão o mesmo resultado aqui; em janelas longas
+        # amostra mais esparso (~20 pontos por balde) para não gerar milhões de linhas
+        step = max(SAMPLE_S, int(bucket.total_seconds() / 20) // SAMPLE_S * SAMPLE_S)
+        last = _last_sample()
+        t = np.arange(last - int(span.total_seconds()), last + 1, step)
+        frame = metric_frame(t)
+        width, origin = bucket.total_seconds(), EPOCH.timestamp()
+        keys = np.floor((t - origin) / width) * width + origin
+        grouped = frame.drop(columns="timestamp").groupby(pd.to_datetime(keys, unit="s", utc=True))
+        out = pd.DataFrame({"timestamp": grouped.size().index, "samples": grouped.size().to_numpy()})
+        desc = [("timestamp", TIMESTAMPTZ), ("samples", INT8)]
+        for c in history.METRIC_COLUMNS:
+            out[f"{c}_min"] = grouped[c].min().to_numpy()
+            out[c]          = grouped[c].mean().to_numpy()
+            out[f"{c}_max"] = grouped[c].max().to_numpy()
+            out[f"{c}_p95"] = grouped[c].quantile(0.95).to_numpy()
+            desc += [(f"{c}_min", FLOAT8), (c, FLOAT8), (f"{c}_max", FLOAT8), (f"{c}_p95", FLOAT8)]
+        out = out.iloc[::-1]
+        return list(out.itertuples(index=False, name=None)), desc
+
+    # --- pg_stat_activity ---
+    def _filtered(self, sql, params):
+        # Mesma ordem de parâmetros de processes._filters
+        rows, now = self.sessions, datetime.now(timezone.utc)
+        if "state IN %s" in sql:
+            states = set(params.pop(0))
+            rows = [s for s in rows if s["state"] in states]
+        if "usename = %s" in sql:
+            user = params.pop(0)
+            rows = [s for s in rows if s["usename"] == user]
+        if "now() - query_start >= %s" in sql:
+            min_duration = params.pop(0)
+            rows = [s for s in rows if now - s["query_start"] >= min_duration]
+        if "wait_event_type = %s" in sql:
+            wait_type = params.pop(0)
+            rows = [s for s in rows if s["wait_event_type"] == wait_type]
+        if "wait_event = %s" in sql:
+            wait = params.pop(0)
+            rows = [s for s in rows if s["wait_event"] == wait]
+        return rows, now
+
+    @staticmethod
+    def _ms(now, s):
+        return (now - s["query_start"]).total_seconds() * 1000
+
+    def _processes(self, sql, params):
+        rows, now = self._filtered(sql, params)
+        name = next(n for n, (expr, _) in processes.SORTS.items() if f"ORDER BY {expr}" in sql)
+        key = {"duração": lambda s: s["query_start"], "pid": lambda s: s["pid"],
+               "usuário": lambda s: s["usename"]}[name]
+        rows = sorted(rows, key=lambda s: (key(s), s["pid"]))
+        if "(%s, %s)" in sql:
+            after_key, after_pid = params.pop(0), int(params.pop(0))
+            parse = {"duração": datetime.fromisoformat, "pid": int, "usuário": str}[name]
+            after = (parse(after_key), after_pid)
+            rows = [s for s in rows if (key(s), s["pid"]) > after]
+        limit = int(params.pop(0))
+        out = [(s["pid"], s["usename"], s["state"], s["backend_type"], s["wait_event_type"], s["wait_event"],
+                self._ms(now, s), s["query_start"], s["query_start"], s["query_start"], s["query"][:120],
+                key(s).isoformat() if name == "duração" else str(key(s)))
+               for s in rows[:limit]]
+        desc = [("pid", INT4), ("usuario", TEXT), ("status", TEXT), ("backend_type", TEXT),
+                ("wait_event_type", TEXT), ("wait_event", TEXT), ("duracao_ms", FLOAT8),
+                ("query_start", TIMESTAMPTZ), ("xact_start", TIMESTAMPTZ), ("state_change", TIMESTAMPTZ),
+                ("query", TEXT), ("sort_key", TEXT)]
+        return out, desc
+
+    def _fingerprints(self, sql, params):
+        rows, now = self._filtered(sql, params)
+        limit = int(params.pop(0))
+        groups = {}
+        for s in rows:
+            g = groups.setdefault(processes.fingerprint(s["query"]), [0, 0, 0, 0.0])
+            g[0] += 1
+            g[1] += s["state"] == "active"
+            g[2] += s["state"].startswith("idle in transaction")
+            g[3] = max(g[3], self._ms(now, s))
+        ranked = sorted(groups.items(), key=lambda kv: (-kv[1][0], kv[0]))[:limit]
+        out = [(fp[:160], *g) for fp, g in ranked]
+        desc = [("fingerprint", TEXT), ("sessoes", INT8), ("ativas", INT8), ("idle_tx", INT8), ("maior_duracao_ms", FLOAT8)]
+        return out, desc
+
+    def _durations(self, sql, params):
+        rows, now = self._filtered(sql, params)
+        out = [(s["pid"], s["state"], self._ms(now, s)) for s in rows]
+        return out, [("pid", INT4), ("status", TEXT), ("duracao_ms", FLOAT8)]
+
+    def _locks(self, sql, params):
+        now = datetime.now(timezone.utc)
+        by_pid = {s["pid"]: s for s in self.sessions}
+        waiting = [s for s in self.sessions if s["blocked_by"]]
+        involved = {s["pid"] for s in waiting} | {b for s in waiting for b in s["blocked_by"]}
+        out = []
+        for pid in sorted(involved):
+            s = by_pid[pid]
+            lock = ("transactionid", "ShareLock", None) if s["blocked_by"] else (None, None, None)
+            out.append((pid, s["usename"], s["state"], s["wait_event"], self._ms(now, s), s["query"][:120],
+                        list(s["blocked_by"]), *lock))
+        desc = [("pid", INT4), ("usuario", TEXT), ("status", TEXT), ("wait_event", TEXT), ("duracao_ms", FLOAT8),
+                ("query", TEXT), ("blocked_by", INT4_ARRAY), ("locktype", TEXT), ("mode", TEXT), ("relacao", TEXT)]
+        return out, desc
+
+    # --- PLANOS ---
+    def _statements(self, sql, params):
+        out = []
+        for i, q in enumerate(QUERIES[: params["limit"]]):
+            calls = 1000 * (i + 1)
+            mean_ms = 40.0 * (len(QUERIES) - i)
+            out.append((i, q.format(n="$1", m="$2", k="$3"), calls, mean_ms, mean_ms * calls, 10.0 * (i + 1)))
+        desc = [("queryid", INT8), ("query", TEXT), ("calls", INT8), ("mean_ms", FLOAT8),
+                ("total_ms", FLOAT8), ("rows_per_call", FLOAT8)]
+        return out, desc
+
+    def _explain(self, sql, params):
+        query = re.sub(r"^\s*EXPLAIN\s*\([^)]*\)\s*", "", sql)
+        return [([fake_plan(query)],)], [("QUERY PLAN", JSON)]
+
+    def _reltuples(self, sql, params):
+        names = params[0]
+        return [(n, float(RELTUPLES[n])) for n in names if n in RELTUPLES], [("relname", TEXT), ("max", FLOAT8)]
+
+    def _context(self, sql, params):
+        last = _last_sample()
+        trend = metric_frame(np.arange(last, last - SAMPLE_S * params["trend_rows"], -SAMPLE_S))
+        trend["timestamp"] = trend["timestamp"].map(lambda ts: ts.isoformat())
+        statements = []
+        for i, q in enumerate(QUERIES[: params["top_n"]]):
+            calls = 1000 * (i + 1)
+            statements.append({"queryid": i, "query": processes.fingerprint(q), "calls": calls,
+                               "total_ms": round(calls * (5.0 + 3 * i), 1), "mean_ms": 5.0 + 3 * i,
+                               "rows": calls, "shared_blks_hit": 100 * calls, "shared_blks_read": 7 * calls})
+        ctx = {
+            "bloat": [{"tabela": "public.pedidos", "n_live_tup": 120000, "n_dead_tup": 30000,
+                       "dead_pct": 20.0, "last_autovacuum": None}],
+            "seq_scans": [{"tabela": "public.itens", "seq_scan": 5400, "seq_tup_read": 81000000,
+                           "idx_scan": 12, "n_live_tup": 15000}],
+            "unused_indexes": [{"indice": "public.eventos_tipo_idx", "tabela": "eventos", "bytes": 8 << 20}],
+            "trend": trend.to_dict("records"),
+        }
+        if "pg_stat_statements" in sql:
+            ctx["top_total"] = statements
+            ctx["top_mean"]  = sorted(statements, key=lambda r: -r["mean_ms"])
+        return [(ctx,)], [("json_build_object", JSON)]
+
+
+def _node(kind, rows, width, cost, relation=None, plans=(), **extra):
+    node = {"Node Type": kind, "Plan Rows": rows, "Plan Width": width, "Total Cost": cost}
+    if relation:
+        node["Relation Name"] = relation
+    if plans:
+        node["Plans"] = list(plans)
+    node.update(extra)
+    return node
+
+
+def fake_plan(query, now=None):
+    # Um plano plausível por formato de consulta; o de pedidos por cliente alterna
+    # entre índice e seq scan a cada 10 minutos, para exercitar a detecção de regressão
+    now = time.time() if now is None else now
+    if "cliente_id" in query:
+        if int(now // 600) % 2:
+            root = _node("Seq Scan", 12, 96, 48_500.0, "pedidos", Filter="((cliente_id = $1) AND (status = 'aberto'::text))")
+        else:
+            root = _node("Index Scan", 12, 96, 8.4, "pedidos", **{"Index Name": "pedidos_cliente_id_idx"})
+    elif "JOIN" in query:
+        outer = _node("Seq Scan", 50_000, 8, 41_000.0, "pedidos", Filter="(criado_em > (now() - $1::interval))")
+        inner = _node("Seq Scan", 15, 8, 290_000.0, "itens", Filter="(pedido_id = p.id)")
+        root = _node("Aggregate", 1, 8, 9.5e9, plans=[_node("Nested Loop", 750_000, 0, 9.5e9, plans=[outer, inner], **{"Join Type": "Inner"})],
+                     Strategy="Plain")
+    elif "date_trunc" in query:
+        scan = _node("Seq Scan", 2_000_000, 16, 36_000.0, "pedidos")
+        root = _node("GroupAggregate", 8_760, 40, 410_000.0, plans=[_node("Sort", 2_000_000, 16, 380_000.0, plans=[scan])],
+                     Strategy="Sorted")
+    elif query.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+        relation = re.search(r"(?:INTO|UPDATE|FROM)\s+(\w+)", query, re.I).group(1)
+        root = _node("ModifyTable", 0, 0, 12.0, relation, plans=[_node("Index Scan", 1, 6, 8.3, relation)])
+    else:
+        root = _node("Index Scan", 3, 40, 12.9, "clientes", **{"Index Name": "clientes_pkey"})
+    return {"Plan": root, "Planning Time": 0.2}
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        self._rows, self.description = self._db.execute(sql, params)
+        self.rowcount = len(self._rows)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    server_version = 160000
+
+    def __init__(self, db):
+        self._db = db
+        self.autocommit = False
+        self.closed = 0
+
+    def cursor(self):
+        if self.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        return FakeCursor(self._db)
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_UNKNOWN if self.closed else extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+# Banco do processo: todas as conexões (de todas as sessões) enxergam o mesmo
+_database = None
+_database_lock = threading.Lock()
+
+
+def configure(sessions=300, latency_ms=0.0, seed=42):
+    global _database
+    with _database_lock:
+        _database = FakeDatabase(sessions, latency_ms, seed)
+    return _database
+
+
+def database():
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = FakeDatabase()
+        return _database
+
+
+def connect(**kwargs):
+    # Aceita (e ignora) os argumentos de psycopg2.connect
+    return FakeConnection(database())
+
+
+def counts():
+    return database().counts()
+
+
+def seed(conn, days=7, step_s=SAMPLE_S, page_size=5000):
+    # Grava a série sintética em db_metrics_history (Postgres de verdade); devolve o nº de linhas
+    last = _last_sample()
+    frame = metric_frame(np.arange(last - days * 86400, last + 1, step_s))
+    rows = [(ts.to_pydatetime(), float(cpu), int(conns), float(lat), int(slow))
+            for ts, cpu, conns, lat, slow in frame.itertuples(index=False, name=None)]
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO db_metrics_history ("timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count)
+            VALUES %s
+        """, rows, page_size=page_size)
+    if not conn.autocommit:
+        conn.commit()
+    return len(rows)
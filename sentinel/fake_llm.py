@@ -0,0 +1,66 @@
+"""
+Cliente falso com a mesma interface usada do google.generativeai.GenerativeModel.
+
+Resposta determinística (derivada do prompt), entregue em trechos com atraso
+configurável. Serve para rodar o app e os benchmarks sem chave do Gemini:
+ative com FAKE_LLM = true nos secrets.
+"""
+
+import hashlib
+import threading
+import time
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Response:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    @property
+    def text(self):
+        return "".join(c.text for c in self._chunks)
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+class FakeModel:
+    def __init__(self, delay=0.02, chunk_words=8):
+        self.delay       = delay
+        self.chunk_words = chunk_words
+        self.calls       = 0
+        self._lock       = threading.Lock()
+
+    def _answer(self, prompt):
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        score = int(digest[:2], 16) * 100 // 255
+        return (
+            "### 🏥 DIAGNÓSTICO DE SAÚDE\n"
+            "Resposta simulada (FAKE_LLM) para a telemetria recebida.\n\n"
+            "### ⚠️ GARGALOS IDENTIFICADOS\n"
+            "- Nenhum gargalo real avaliado: cliente de teste.\n\n"
+            "### 🔧 COMANDOS SQL DE TUNING\n"
+            "```sql\nSELECT * FROM pg_stat_activity WHERE state <> 'idle';\n```\n\n"
+            "### 📊 SCORE DE SAÚDE\n"
+            f"| Score | Prompt |\n|---|---|\n| {score} | {digest[:12]} |\n"
+        )
+
+    def _chunks(self, text):
+        words = text.split(" ")
+        for i in range(0, len(words), self.chunk_words):
+            if self.delay:
+                time.sleep(self.delay)
+            sep = " " if i + self.chunk_words < len(words) else ""
+            yield _Chunk(" ".join(words[i:i + self.chunk_words]) + sep)
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        chunks = self._chunks(self._answer(prompt))
+        if stream:
+            return chunks
+        return _Response(list(chunks))
@@ -0,0 +1,98 @@
+"""
+Fábrica dos gráficos do dashboard.
+
+O tema escuro é registrado uma vez como template do Plotly, em vez de
+update_layout/update_xaxes/update_yaxes a cada rerun. As figuras prontas
+ficam memorizadas por (fonte, versão do snapshot, gráfico) e são
+compartilhadas entre sessões: só são montadas de novo quando os dados mudam.
+O st.plotly_chart serializa a figura a cada rerun (to_dict, uma cópia profunda,
+e depois o JSON); a FrozenFigure guarda o dict pronto, então um rerun sem dados
+novos só paga a codificação do JSON.
+"""
+
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from sentinel import tracing
+from sentinel.downsample import lttb_frame, points_for_width
+
+TEMPLATE = "db_sentinel"
+
+pio.templates[TEMPLATE] = go.layout.Template(layout=dict(
+    paper_bgcolor='#04080f', plot_bgcolor='#04080f', font_color='#00ffc377',
+    margin=dict(t=10, b=10),
+    xaxis=dict(gridcolor='#00ffc308'), yaxis=dict(gridcolor='#00ffc308'),
+))
+
+# Largura aproximada de cada gráfico (meia tela / tela cheia)
+HALF_POINTS = points_for_width(600)
+FULL_POINTS = points_for_width(1200)
+
+
+def cpu_figure(df):
+    return px.area(lttb_frame(df, 'timestamp', 'cpu_usage', HALF_POINTS), x='timestamp', y='cpu_usage',
+                   color_discrete_sequence=['#ff4466'], labels={'cpu_usage':'CPU %','timestamp':''}, template=TEMPLATE)
+
+
+def latency_figure(df):
+    return px.line(lttb_frame(df, 'timestamp', 'avg_latency_ms', HALF_POINTS), x='timestamp', y='avg_latency_ms', markers=True,
+                   color_discrete_sequence=['#00ffc3'], labels={'avg_latency_ms':'ms','timestamp':''}, template=TEMPLATE)
+
+
+def connections_figure(df):
+    return px.bar(lttb_frame(df, 'timestamp', 'active_connections', FULL_POINTS), x='timestamp', y='active_connections',
+                  color_discrete_sequence=['#7b2d8b'], labels={'active_connections':'Conexões','timestamp':''}, template=TEMPLATE)
+
+
+def duration_figure(hist):
+    # Histograma por faixa de duração (ver processes.duration_histogram); não é memorizado
+    return px.bar(hist, x='faixa', y='sessoes', color_discrete_sequence=['#00ffc3'],
+                  labels={'faixa':'','sessoes':'Sessões'}, template=TEMPLATE)
+
+
+class FrozenFigure(go.Figure):
+    # Figura memorizada não é mais alterada: to_dict devolve sempre o mesmo dict
+    # (só leitura), em vez de copiar a árvore inteira a cada rerun
+    def __init__(self, fig):
+        super().__init__(fig)
+        self._spec = super().to_dict()
+
+    def to_dict(self):
+        return self._spec
+
+
+BUILDERS = {
+    "cpu":         cpu_figure,
+    "latency":     latency_figure,
+    "connections": connections_figure,
+}
+
+
+class FigureFactory:
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock    = threading.Lock()
+        self.builds   = 0
+        self.hits     = 0
+
+    def get(self, name, source, version, df):
+        # `df` só é usado (e ordenado) quando a chave ainda não existe
+        key = (name, source, version)
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig
+            with tracing.span(f"figure.build.{name}"):
+                fig = FrozenFigure(BUILDERS[name](df.sort_values('timestamp')))
+            self.builds += 1
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+            return fig
@@ -0,0 +1,133 @@
+"""
+Modo frota: coleta concorrente de vários bancos Postgres.
+
+Cada alvo tem um pool pequeno próprio e no máximo uma coleta em andamento: o
+pool de threads tem o tamanho da frota, então nenhum alvo fica na fila. A
+rodada tem um prazo único, fixado no início, e a conexão tem connect_timeout e
+statement_timeout: um host lento vira "timeout" na grade sem atrasar os outros,
+e a rodada leva o tempo do alvo mais lento (limitado ao prazo), não a soma de
+todos. Uma coleta que estourou o prazo não pode ser interrompida e segue
+ocupando a thread do alvo; enquanto ela não termina, as rodadas seguintes não
+abrem outra para o mesmo alvo e o marcam como "stale".
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import pandas as pd
+import psycopg2
+from psycopg2 import errors
+
+from sentinel.columnar import read_frame
+from sentinel.pool import ConnectionPool
+
+STATS_SQL = """
+    SELECT (SELECT count(*) FROM pg_stat_activity) AS sessoes,
+           (SELECT count(*) FROM pg_stat_activity WHERE state <> 'idle') AS sessoes_ativas,
+           (SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock') AS esperando_lock,
+           (SELECT round(100.0 * sum(blks_hit) / nullif(sum(blks_hit + blks_read), 0), 2)::float8
+              FROM pg_stat_database) AS cache_hit_pct
+"""
+
+LATEST_SQL = """
+    SELECT "timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count
+    FROM db_metrics_history ORDER BY "timestamp" DESC LIMIT 1
+"""
+
+HISTORY_SQL = """
+    SELECT "timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count
+    FROM db_metrics_history ORDER BY "timestamp" DESC LIMIT %s
+"""
+
+
+@dataclass(frozen=True)
+class Target:
+    name: str
+    host: str
+    dbname: str = "postgres"
+    user: str = "postgres"
+    password: str = ""
+    port: int = 5432
+
+
+def load_targets(entries):
+    # `entries`: lista de tabelas [[FLEET]] dos secrets (ou dicts equivalentes)
+    targets = []
+    for entry in entries or ():
+        entry = dict(entry)
+        entry.setdefault("name", entry.get("host"))
+        if "database" in entry:
+            entry.setdefault("dbname", entry.pop("database"))
+        targets.append(Target(**{k: entry[k] for k in Target.__dataclass_fields__ if k in entry}))
+    return targets
+
+
+class FleetCollector:
+    def __init__(self, targets, timeout=5.0):
+        self.targets  = list(targets)
+        self.timeout  = timeout
+        self._pools   = {t.name: self._make_pool(t) for t in self.targets}
+        # Uma thread por alvo e uma coleta por alvo de cada vez: ninguém espera na fila
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.targets)),
+                                            thread_name_prefix="db-sentinel-fleet")
+        self._running  = {}             # nome do alvo -> future da coleta em andamento
+        self._lock     = threading.Lock()
+
+    def _make_pool(self, target):
+        timeout_ms = int(self.timeout * 1000)
+        def connect():
+            conn = psycopg2.connect(
+                host=target.host, port=target.port, dbname=target.dbname,
+                user=target.user, password=target.password,
+                connect_timeout=max(1, int(self.timeout)),
+                options=f"-c statement_timeout={timeout_ms}",
+            )
+            conn.autocommit = True
+            return conn
+        # Sem retries: quem decide o prazo é a rodada da frota
+        return ConnectionPool(connect, minconn=0, maxconn=2, timeout=self.timeout, retries=0)
+
+    def pool(self, name):
+        return self._pools[name]
+
+    def _collect_one(self, target):
+        started = time.monotonic()
+        row = {"alvo": target.name, "host": target.host}
+        with self._pools[target.name].connection() as conn:
+            row.update(read_frame(conn, STATS_SQL).iloc[0].to_dict())
+            try:
+                latest = read_frame(conn, LATEST_SQL)
+            except (errors.UndefinedTable, errors.UndefinedColumn):
+                latest = pd.DataFrame()
+        if not latest.empty:
+            row.update(latest.iloc[0].to_dict())
+        row["status"] = "ok"
+        row["coleta_ms"] = 1000 * (time.monotonic() - started)
+        return row
+
+    def collect(self):
+        deadline = time.monotonic() + self.timeout
+        futures, busy = {}, []
+        with self._lock:
+            for t in self.targets:
+                previous = self._running.get(t.name)
+                if previous is not None and not previous.done():
+                    busy.append(t)      # a coleta de uma rodada anterior ainda segura a thread
+                    continue
+                futures[t.name] = self._running[t.name] = self._executor.submit(self._collect_one, t)
+        done, _ = wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+        rows = []
+        for target in self.targets:
+            base = {"alvo": target.name, "host": target.host}
+            future = futures.get(target.name)
+            if future is None:
+                rows.append({**base, "status": "stale", "erro": "coleta anterior ainda sem resposta"})
+            elif future not in done:
+                rows.append({**base, "status": "timeout", "erro": f"sem resposta em {self.timeout:.0f}s"})
+            elif future.exception() is not None:
+                rows.append({**base, "status": "erro", "erro": str(future.exception()).strip()})
+            else:
+                rows.append(future.result())
+        return pd.DataFrame(rows)
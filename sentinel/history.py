@@ -0,0 +1,192 @@
+"""
+Consultas de histórico de db_metrics_history.
+
+A janela ao vivo é incremental: IncrementalHistory guarda o último
+"timestamp" visto e só busca as linhas mais novas, que entram num buffer
+circular de tamanho fixo. Para janelas longas o Postgres agrupa as amostras
+em baldes (date_bin) e devolve min/avg/max/p95 por balde, limitado a
+`max_points` pontos. A média sai com o nome original da coluna, então os
+gráficos não mudam. Quando existem as tabelas de rollup (sentinel.schema), a
+consulta lê a camada mais grossa que ainda atende a largura do balde; se o
+rollup ficou para trás das amostras brutas (manutenção parada), o final da
+janela é completado a partir delas.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from psycopg2 import errors
+
+from sentinel.columnar import read_frame
+from sentinel.ringbuffer import RingBuffer
+
+# Colunas usadas pelos KPIs e gráficos; nada de SELECT *
+METRIC_COLUMNS = ("cpu_usage", "active_connections", "avg_latency_ms", "slow_queries_count")
+
+RANGES = {
+    "AO VIVO": None,                    # snapshot do coletor
+    "1H":  timedelta(hours=1),
+    "6H":  timedelta(hours=6),
+    "24H": timedelta(days=1),
+    "7D":  timedelta(days=7),
+    "30D": timedelta(days=30),
+}
+
+# Larguras "redondas" de balde, da menor para a maior
+BUCKETS = [timedelta(seconds=s) for s in (
+    1, 5, 10, 30, 60, 300, 600, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400,
+)]
+
+DEFAULT_MAX_POINTS = 300
+
+# Camadas de rollup mantidas por sentinel.schema: (tabela, largura do balde, retenção)
+RAW_RETENTION = timedelta(days=7)
+ROLLUPS = (
+    ("db_metrics_rollup_1m", timedelta(minutes=1), timedelta(days=30)),
+    ("db_metrics_rollup_1h", timedelta(hours=1),   timedelta(days=365)),
+    ("db_metrics_rollup_1d", timedelta(days=1),    None),
+)
+
+LIVE_SQL = """
+    SELECT "timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count
+    FROM db_metrics_history
+    WHERE "timestamp" > %s
+    ORDER BY "timestamp" DESC LIMIT %s;
+"""
+
+# Último balde do rollup e última amostra bruta (ambos pelo índice, sem varrer)
+FRESHNESS_SQL = """
+    SELECT (SELECT max(bucket) FROM {table}), (SELECT max("timestamp") FROM db_metrics_history);
+"""
+
+# Origem do date_bin em todas as consultas
+BUCKET_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def bucket_for(span, max_points=DEFAULT_MAX_POINTS):
+    target = span / max_points
+    for bucket in BUCKETS:
+        if bucket >= target:
+            return bucket
+    return BUCKETS[-1]
+
+
+def tier_for(bucket, span):
+    # Rollup mais grosso cuja largura divide o balde e cuja retenção cobre a janela;
+    # None = amostras brutas
+    for table, width, retention in reversed(ROLLUPS):
+        if width <= bucket and bucket % width == timedelta(0) and (retention is None or span <= retention):
+            return table
+    return None
+
+
+def _check_columns(columns):
+    unknown = set(columns) - set(METRIC_COLUMNS)
+    if unknown:
+        raise ValueError(f"colunas desconhecidas: {', '.join(sorted(unknown))}")
+
+
+def raw_aggregates(columns=METRIC_COLUMNS):
+    # min/avg/max/p95 sobre amostras brutas; também usado para montar os rollups
+    _check_columns(columns)
+    aggs = []
+    for c in columns:
+        aggs.append(f"min({c}) AS {c}_min")
+        aggs.append(f"avg({c})::float8 AS {c}")
+        aggs.append(f"max({c}) AS {c}_max")
+        aggs.append(f"percentile_cont(0.95) WITHIN GROUP (ORDER BY {c}) AS {c}_p95")
+    return aggs
+
+
+def _rollup_aggregates(columns):
+    # Reagrega baldes de rollup: média ponderada pelas amostras; o p95 é o maior
+    # p95 dos baldes (exato quando o balde pedido tem a largura da camada)
+    _check_columns(columns)
+    aggs = []
+    for c in columns:
+        aggs.append(f"min({c}_min) AS {c}_min")
+        aggs.append(f"(sum({c} * samples) / nullif(sum(samples) FILTER (WHERE {c} IS NOT NULL), 0))::float8 AS {c}")
+        aggs.append(f"max({c}_max) AS {c}_max")
+        aggs.append(f"max({c}_p95) AS {c}_p95")
+    return aggs
+
+
+def build_history_query(span, max_points=DEFAULT_MAX_POINTS, columns=METRIC_COLUMNS, rollups=True, since=None):
+    bucket = bucket_for(span, max_points)
+    tier = tier_for(bucket, span) if rollups else None
+    if tier is None:
+        source, ts, samples, aggs = "db_metrics_history", '"timestamp"', "count(*)", raw_aggregates(columns)
+    else:
+        source, ts, samples, aggs = tier, "bucket", "sum(samples)::bigint", _rollup_aggregates(columns)
+    select_list = ",\n               ".join(aggs)
+    where, params = f"{ts} >= now() - %s", (bucket, span)
+    if since is not None:
+        where, params = f"{where} AND {ts} >= %s", params + (since,)
+    sql = f"""
+        SELECT date_bin(%s, {ts}, TIMESTAMPTZ '2000-01-01') AS "timestamp",
+               {samples} AS samples,
+               {select_list}
+        FROM {source}
+        WHERE {where}
+        GROUP BY 1
+        ORDER BY 1 DESC
+    """
+    return sql, params
+
+
+def _stale_since(conn, tier, bucket):
+    # Início (alinhado ao balde pedido) do trecho que o rollup ainda não cobre;
+    # None quando a última amostra bruta cabe no último balde do rollup
+    width = next(w for table, w, _ in ROLLUPS if table == tier)
+    with conn.cursor() as cur:
+        cur.execute(FRESHNESS_SQL.format(table=tier))
+        rollup_max, raw_max = cur.fetchone()
+    if rollup_max is None or raw_max is None or raw_max < rollup_max + width:
+        return None
+    return BUCKET_ORIGIN + (rollup_max - BUCKET_ORIGIN) // bucket * bucket
+
+
+def fetch_history(conn, span, max_points=DEFAULT_MAX_POINTS):
+    sql, params = build_history_query(span, max_points)
+    bucket = params[0]
+    tier = tier_for(bucket, span)
+    if tier is not None:
+        try:
+            frame = read_frame(conn, sql, params)
+            if not frame.empty:
+                since = _stale_since(conn, tier, bucket)
+                if since is None:
+                    return frame
+                # Rollup atrasado: os baldes a partir do último dele saem das amostras brutas
+                sql, params = build_history_query(span, max_points, rollups=False, since=since)
+                tail = read_frame(conn, sql, params)
+                return pd.concat([tail, frame[frame["timestamp"] < since]], ignore_index=True)
+        except errors.UndefinedTable:
+            # Rollups ainda não criados (sentinel.schema nunca rodou)
+            if not conn.autocommit:
+                conn.rollback()
+    # Sem rollup (ou ainda vazio): agrega as amostras brutas
+    sql, params = build_history_query(span, max_points, rollups=False)
+    return read_frame(conn, sql, params)
+
+
+class IncrementalHistory:
+    def __init__(self, capacity=20):
+        self._buffer = RingBuffer(capacity)
+        self._hwm    = None             # maior "timestamp" já lido
+        self._lock   = threading.Lock()
+
+    @property
+    def high_water_mark(self):
+        return self._hwm
+
+    def poll(self, conn):
+        # Custo O(linhas novas): na primeira chamada lê a janela inteira
+        with self._lock:
+            since = "-infinity" if self._hwm is None else self._hwm
+            new = read_frame(conn, LIVE_SQL, (since, self._buffer.capacity))
+            if not new.empty:
+                self._hwm = new["timestamp"].iloc[0].to_pydatetime()
+                self._buffer.append(new.iloc[::-1])
+            return self._buffer.frame()
@@ -0,0 +1,130 @@
+"""
+Jobs em segundo plano com pool limitado de threads.
+
+Cada job recebe um id, status, prazo (timeout) e pode ser cancelado. A
+interface só consulta o status/texto parcial do job, sem bloquear o script.
+O pool limita quantos jobs rodam ao mesmo tempo no processo e quantos podem
+esperar na fila; acima disso submit() recusa com JobRejected.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED, TIMEOUT = (
+    "pending", "running", "done", "failed", "cancelled", "timeout",
+)
+FINISHED = {DONE, FAILED, CANCELLED, TIMEOUT}
+
+
+class JobRejected(Exception):
+    pass
+
+
+def budget_ms(deadline):
+    # Quanto resta até o prazo do job, para limitar consultas (statement_timeout)
+    # e esperas; TimeoutError quando já acabou, que o JobRunner marca como timeout
+    left = int(1000 * (deadline - time.monotonic()))
+    if left <= 0:
+        raise TimeoutError("prazo do job esgotado")
+    return left
+
+
+class Job:
+    def __init__(self, job_id, timeout):
+        self.id          = job_id
+        self.status      = PENDING
+        self.created_at  = time.time()
+        self.started_at  = None
+        self.finished_at = None
+        self.timeout     = timeout
+        self.deadline    = time.monotonic() + timeout
+        self.error       = None
+        self.cancel_event = threading.Event()
+        self._parts  = []
+        self._future = None
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def append(self, text):
+        self._parts.append(text)
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self._finish(CANCELLED)
+
+    def _finish(self, status, error=None):
+        self.status      = status
+        self.error       = error
+        self.finished_at = time.time()
+
+
+class JobRunner:
+    def __init__(self, max_workers=2, max_pending=8, keep=256):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep        = keep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-sentinel-job")
+        self._jobs     = OrderedDict()
+        self._lock     = threading.Lock()
+        self._ids      = itertools.count(1)
+
+    def submit(self, fn, timeout=60.0):
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if not j.finished)
+            if active >= self.max_workers + self.max_pending:
+                raise JobRejected(f"{active} jobs em andamento")
+            job = Job(f"job-{next(self._ids)}", timeout)
+            self._jobs[job.id] = job
+            self._trim_locked()
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel()
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+    def _trim_locked(self):
+        excess = len(self._jobs) - self.keep
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _run(self, job, fn):
+        if job.cancel_event.is_set():
+            job._finish(CANCELLED)
+            return
+        if time.monotonic() >= job.deadline:
+            job._finish(TIMEOUT)
+            return
+        job.status     = RUNNING
+        job.started_at = time.time()
+        try:
+            fn(job)
+        except TimeoutError as e:
+            job._finish(TIMEOUT, str(e) or "tempo esgotado")
+        except Exception as e:
+            job._finish(FAILED, str(e) or e.__class__.__name__)
+        else:
+            job._finish(CANCELLED if job.cancel_event.is_set() else DONE)
@@ -0,0 +1,148 @@
+"""
+Análise de contenção de locks e cadeias de bloqueio.
+
+Uma consulta pega as sessões esperando lock (wait_event_type = 'Lock') com
+pg_blocking_pids(), mais quem as bloqueia e o lock aguardado em pg_locks.
+O grafo (bloqueador -> bloqueado) é montado em tempo linear no número de
+linhas + arestas, com os bloqueadores raiz e a profundidade de cada cadeia.
+"""
+
+from collections import deque
+
+from sentinel.columnar import read_frame
+
+LOCKS_SQL = f"""
+    WITH waiting AS (
+        SELECT pid, pg_blocking_pids(pid) AS blocked_by
+        FROM pg_stat_activity
+        WHERE wait_event_type = 'Lock'
+    ), involved AS (
+        SELECT pid FROM waiting
+        UNION
+        SELECT unnest(blocked_by) FROM waiting
+    )
+    SELECT i.pid, a.usename AS usuario, a.state AS status, a.wait_event,
+           extract(epoch FROM now() - a.query_start)::float8 * 1000 AS duracao_ms,
+           left(regexp_replace(coalesce(a.query, ''), '\\s+', ' ', 'g'), 120) AS query,
+           coalesce(w.blocked_by, '{{}}'::int[]) AS blocked_by,
+           l.locktype, l.mode, l.relation::regclass::text AS relacao
+    FROM involved i
+    LEFT JOIN pg_stat_activity a ON a.pid = i.pid
+    LEFT JOIN waiting w ON w.pid = i.pid
+    LEFT JOIN LATERAL (
+        SELECT locktype, mode, relation FROM pg_locks
+        WHERE pid = i.pid AND NOT granted LIMIT 1
+    ) l ON true
+"""
+
+
+class LockGraph:
+    def __init__(self, info, children, parents):
+        self.info     = info        # pid -> dict com os dados da sessão
+        self.children = children    # bloqueador -> [bloqueados]
+        self.parents  = parents     # bloqueado -> [bloqueadores]
+        self.roots    = []
+        self.depth    = {}
+        self.blocked_total = {}     # raiz -> sessões alcançadas na cadeia
+        self.cycles   = []          # nós só alcançáveis por ciclo (deadlock em formação)
+        self._walk()
+
+    def _bfs(self, root):
+        reached = 0
+        self.depth[root] = 0
+        queue = deque([root])
+        while queue:
+            pid = queue.popleft()
+            for child in self.children.get(pid, ()):
+                if child not in self.depth:
+                    self.depth[child] = self.depth[pid] + 1
+                    reached += 1
+                    queue.append(child)
+        self.blocked_total[root] = reached
+
+    def _walk(self):
+        nodes = set(self.children) | set(self.parents)
+        for pid in nodes:
+            if pid in self.children and not self.parents.get(pid):
+                self.roots.append(pid)
+        for root in self.roots:
+            self._bfs(root)
+        # O que sobrou só é alcançável por um ciclo: sobe pelos bloqueadores até
+        # repetir um nó, que está no ciclo, e usa esse nó como raiz
+        for pid in nodes:
+            if pid in self.depth:
+                continue
+            path = set()
+            while pid not in path:
+                path.add(pid)
+                pid = self.parents[pid][0]
+            self.cycles.append(pid)
+            self.roots.append(pid)
+            self._bfs(pid)
+        self.roots.sort(key=lambda p: -self.blocked_total[p])
+
+    @property
+    def max_depth(self):
+        return max(self.depth.values(), default=0)
+
+    @property
+    def blocked_count(self):
+        return sum(1 for p in self.parents if self.parents[p])
+
+    def _label(self, pid):
+        row = self.info.get(pid, {})
+        parts = [f"pid {pid}"]
+        if row.get("usuario"):
+            parts.append(str(row["usuario"]))
+        if row.get("status"):
+            parts.append(str(row["status"]))
+        if row.get("duracao_ms") is not None and row["duracao_ms"] == row["duracao_ms"]:
+            parts.append(f"{row['duracao_ms'] / 1000:.1f}s")
+        if row.get("mode"):
+            parts.append(f"espera {row['mode']} em {row.get('relacao') or row.get('locktype')}")
+        text = " | ".join(parts)
+        if row.get("query"):
+            text += f" :: {row['query'][:80]}"
+        return text
+
+    def tree_lines(self, max_lines=200):
+        # DFS iterativa; cada sessão aparece uma vez, sob o primeiro bloqueador visitado
+        lines, seen = [], set()
+        for root in self.roots:
+            tag = "♻️ CICLO" if root in self.cycles else f"🔒 RAIZ (bloqueia {self.blocked_total[root]})"
+            stack = [(root, 0)]
+            while stack:
+                pid, level = stack.pop()
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                prefix = tag + " " if level == 0 else "   " * (level - 1) + "└─ "
+                extra = len(self.parents.get(pid, ())) - 1
+                suffix = f" (+{extra} bloqueadores)" if level and extra > 0 else ""
+                lines.append(prefix + self._label(pid) + suffix)
+                if len(lines) >= max_lines:
+                    lines.append("...")
+                    return lines
+                for child in reversed(self.children.get(pid, ())):
+                    if child not in seen:
+                        stack.append((child, level + 1))
+        return lines
+
+
+def build_lock_graph(rows):
+    # rows: iterável de dicts com "pid" e "blocked_by" (lista de pids)
+    info, children, parents = {}, {}, {}
+    for row in rows:
+        pid = int(row["pid"])
+        info[pid] = row
+        blockers = [int(b) for b in (row.get("blocked_by") or ())]
+        if blockers:
+            parents[pid] = blockers
+            for b in blockers:
+                children.setdefault(b, []).append(pid)
+    return LockGraph(info, children, parents)
+
+
+def fetch_lock_graph(conn):
+    frame = read_frame(conn, LOCKS_SQL)
+    return build_lock_graph(frame.to_dict("records"))
@@ -0,0 +1,69 @@
+"""
+Envio de notificações: e-mail (SMTP_SSL) e webhook JSON.
+
+send_mail é o mesmo caminho usado pela redefinição de senha; os notificadores
+recebem a lista de eventos de sentinel.alerts e montam a mensagem.
+"""
+
+import json
+import smtplib
+import urllib.request
+from email.message import EmailMessage
+
+SMTP_KEYS = ("SMTP_SERVER", "SMTP_PORT", "SMTP_USER", "SMTP_PASS")
+
+
+def missing_smtp(secrets):
+    return [k for k in SMTP_KEYS if k not in secrets]
+
+
+def send_mail(smtp, to, subject, body):
+    # `smtp`: mapeamento com as chaves de SMTP_KEYS (ex.: st.secrets)
+    msg = EmailMessage()
+    msg.set_content(body)
+    msg['Subject'] = subject
+    msg['From'] = smtp["SMTP_USER"]
+    msg['To'] = to
+    with smtplib.SMTP_SSL(smtp["SMTP_SERVER"], smtp["SMTP_PORT"]) as server:
+        server.login(smtp["SMTP_USER"], smtp["SMTP_PASS"])
+        server.send_message(msg)
+
+
+def post_webhook(url, payload, timeout=5.0):
+    body = json.dumps(payload, default=str).encode()
+    req = urllib.request.Request(url, data=body, method="POST",
+                                 headers={"Content-Type": "application/json", "User-Agent": "DBSentinel-Alerts"})
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return r.status
+
+
+def format_events(events, project=""):
+    firing = [e for e in events if e["estado"] == "disparou"]
+    head = f"{len(firing)} alerta(s)" if firing else f"{len(events)} alerta(s) resolvido(s)"
+    subject = f"DB Sentinel | {project + ' | ' if project else ''}{head}"
+    lines = [f"[{e['severidade'].upper()}] {e['regra']} {e['estado']} em {e['timestamp']}: "
+             f"{e['metrica']} = {e['valor']:.2f} ({e['detalhe']})" for e in events]
+    return subject, "\n".join(lines)
+
+
+class EmailNotifier:
+    def __init__(self, smtp, to, project=""):
+        self.smtp    = {k: smtp[k] for k in SMTP_KEYS}
+        self.to      = to
+        self.project = project
+
+    def __call__(self, events):
+        subject, body = format_events(events, self.project)
+        send_mail(self.smtp, self.to, subject, body)
+
+
+class WebhookNotifier:
+    def __init__(self, url, project="", timeout=5.0):
+        self.url     = url
+        self.project = project
+        self.timeout = timeout
+
+    def __call__(self, events):
+        subject, text = format_events(events, self.project)
+        # "text" deixa o payload utilizável direto no Slack/Discord/Teams
+        post_webhook(self.url, {"text": f"{subject}\n{text}", "project": self.project, "alerts": events}, self.timeout)
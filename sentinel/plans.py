@@ -0,0 +1,418 @@
+"""
+Planos de execução das consultas mais lentas.
+
+As consultas vêm de pg_stat_statements (maior tempo médio) ou, sem a
+extensão, das sessões ativas há mais tempo em pg_stat_activity. Cada uma passa
+por EXPLAIN (FORMAT JSON) numa transação READ ONLY com statement_timeout:
+o texto normalizado ($1, $2...) usa GENERIC_PLAN no PG 16+ e, antes disso,
+PREPARE + EXPLAIN EXECUTE com NULLs e plan_cache_mode = force_generic_plan,
+então os NULLs não entram no plano. Sem ANALYZE nada é executado; com
+ANALYZE (opcional) só um SELECT que passa por analyze_safe() é executado: o
+READ ONLY não segura funções com efeito colateral (nextval, pg_advisory_lock,
+dblink...), então toda chamada de função precisa estar na lista de permitidas.
+
+O plano é varrido atrás de seq scans em tabelas grandes, estimativas de linhas
+muito erradas, sorts que não cabem em work_mem e nested loops com muitas
+iterações. Os planos ficam em cache por fingerprint (sentinel.processes); se o
+formato do plano muda entre duas análises, a mudança é registrada e, quando o
+custo sobe, marcada como regressão. plan_lines() resume tudo para o contexto
+do diagnóstico.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2 import errors
+
+from sentinel.context import coarse
+from sentinel.processes import fingerprint
+
+EXPLAINABLE = r"^\s*(select|with|insert|update|delete|values|table)\M"
+
+SLOW_STATEMENTS_SQL = f"""
+    SELECT queryid, query, calls, mean_exec_time::float8 AS mean_ms, total_exec_time::float8 AS total_ms,
+           rows::float8 / nullif(calls, 0) AS rows_per_call
+    FROM pg_stat_statements
+    WHERE calls >= %(min_calls)s
+      AND dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query ~* '{EXPLAINABLE}'
+    ORDER BY mean_exec_time DESC
+    LIMIT %(limit)s
+"""
+
+# Sem pg_stat_statements: as sessões ativas mais antigas (texto com literais)
+ACTIVE_STATEMENTS_SQL = f"""
+    SELECT NULL::bigint AS queryid, query, 1 AS calls,
+           extract(epoch FROM now() - query_start)::float8 * 1000 AS mean_ms,
+           extract(epoch FROM now() - query_start)::float8 * 1000 AS total_ms,
+           NULL::float8 AS rows_per_call
+    FROM pg_stat_activity
+    WHERE state = 'active' AND backend_type = 'client backend' AND pid <> pg_backend_pid()
+      AND now() - query_start >= %(min_ms)s * interval '1 millisecond'
+      AND query ~* '{EXPLAINABLE}'
+    ORDER BY query_start
+    LIMIT %(limit)s
+"""
+
+RELTUPLES_SQL = """
+    SELECT relname, max(reltuples)::float8 FROM pg_class
+    WHERE relname = ANY(%s::name[]) AND relkind IN ('r', 'p', 'm')
+    GROUP BY relname
+"""
+
+WORK_MEM_SQL = "SELECT pg_size_bytes(current_setting('work_mem'))"
+
+# Limiares dos achados
+LARGE_TABLE_ROWS  = 100_000     # seq scan só preocupa acima disto
+MISESTIMATE_RATIO = 10          # estimado x real (qualquer direção)
+MISESTIMATE_MIN   = 100         # ignora erro em contagens pequenas
+NESTED_LOOP_LOOPS = 1_000       # iterações do lado interno
+NESTED_LOOP_WORK  = 1_000_000   # iterações x linhas por iteração
+REGRESSION_RATIO  = 0.5         # custo 50% maior com plano novo = regressão
+
+INDEXED = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Memoize", "Result", "Function Scan"}
+
+# EXPLAIN ANALYZE executa a consulta: só funções sem efeito colateral
+ANALYZE_SAFE_FUNCTIONS = frozenset({
+    "count", "sum", "avg", "min", "max", "bool_and", "bool_or", "every", "array_agg", "string_agg",
+    "json_agg", "jsonb_agg", "percentile_cont", "percentile_disc", "stddev", "variance",
+    "row_number", "rank", "dense_rank", "lag", "lead", "first_value", "last_value",
+    "coalesce", "nullif", "greatest", "least", "abs", "round", "floor", "ceil", "trunc",
+    "lower", "upper", "length", "substr", "substring", "left", "right", "trim", "concat", "replace",
+    "now", "current_date", "date_trunc", "date_part", "extract", "date_bin", "to_char", "age",
+    "jsonb_build_object", "json_build_object", "unnest", "any", "exists",
+})
+# Palavras-chave que aparecem antes de "(" sem ser chamada de função
+_PAREN_KEYWORDS = frozenset({
+    "in", "all", "some", "values", "cast", "over", "filter", "within", "on", "and", "or", "not",
+    "when", "then", "else", "where", "using", "select", "from", "join", "by", "having", "as",
+    "interval", "case", "distinct", "lateral", "row", "array", "is", "like", "ilike", "between",
+})
+
+_ids = itertools.count(1)
+
+
+def param_count(query):
+    return max((int(n) for n in re.findall(r"\$(\d+)", query)), default=0)
+
+
+def analyze_safe(query):
+    # SELECT simples (sem WITH, que pode ter INSERT/UPDATE/DELETE, sem FOR UPDATE
+    # ou INTO) em que toda chamada de função está em ANALYZE_SAFE_FUNCTIONS
+    q = re.sub(r"--[^\n]*|/\*.*?\*/", " ", query, flags=re.S).lower()
+    q = re.sub(r"'(?:[^']|'')*'", "''", q)
+    if not re.match(r"\s*select\b", q) or re.search(r"\bfor\s+(update|share|no\s+key|key)\b|\binto\b", q):
+        return False
+    for name in re.findall(r'([a-z_][a-z0-9_$."]*)\s*\(', q):
+        schema, _, func = name.replace('"', "").rpartition(".")
+        if schema not in ("", "pg_catalog") or (func not in ANALYZE_SAFE_FUNCTIONS and func not in _PAREN_KEYWORDS):
+            return False
+    return True
+
+
+def _single_statement(query):
+    query = query.strip().rstrip(";").strip()
+    if ";" in query:
+        raise ValueError("mais de um comando no texto da consulta")
+    return query
+
+
+def explain(conn, query, timeout_ms=2000, analyze=False):
+    # Devolve o JSON do EXPLAIN (o objeto com "Plan"). ANALYZE só para texto sem
+    # parâmetros (com NULLs no lugar dos $n a execução não diria nada) e que passa
+    # por analyze_safe(); os outros recebem o EXPLAIN simples
+    query = _single_statement(query)
+    n = param_count(query)
+    version = getattr(conn, "server_version", 0)
+    generic = n and version >= 160000
+    options = ["FORMAT JSON"]
+    if generic:
+        options.append("GENERIC_PLAN")
+    if analyze and not n and analyze_safe(query):
+        options += ["ANALYZE", "BUFFERS"]
+    autocommit = conn.autocommit
+    if not autocommit:
+        conn.rollback()
+    conn.autocommit = True   # o BEGIN READ ONLY abaixo é a transação
+    prepared = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("BEGIN TRANSACTION READ ONLY")
+            try:
+                cur.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+                if n and not generic:
+                    # O PREPARE vive na sessão, não na transação: DEALLOCATE antes do ROLLBACK
+                    name = f"sentinel_explain_{next(_ids)}"
+                    if version >= 120000:
+                        cur.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+                    cur.execute(f"PREPARE {name} AS {query}")
+                    prepared = name
+                    cur.execute(f"EXPLAIN ({', '.join(options)}) EXECUTE {name}({', '.join(['NULL'] * n)})")
+                    result = cur.fetchone()[0]
+                    cur.execute(f"DEALLOCATE {name}")
+                    prepared = None
+                else:
+                    cur.execute(f"EXPLAIN ({', '.join(options)}) {query}")
+                    result = cur.fetchone()[0]
+            finally:
+                cur.execute("ROLLBACK")
+                if prepared:
+                    # Falhou no meio (timeout, erro no EXPLAIN): a transação abortada
+                    # não aceita o DEALLOCATE, que roda depois do ROLLBACK
+                    try:
+                        cur.execute(f"DEALLOCATE {prepared}")
+                    except errors.InvalidSqlStatementName:
+                        pass
+    finally:
+        conn.autocommit = autocommit
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+# --- LEITURA DO PLANO ---
+def walk(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+
+def relations(plan):
+    return sorted({n["Relation Name"] for n in walk(plan["Plan"]) if n.get("Relation Name")})
+
+
+def signature(plan):
+    # Formato do plano: tipos de nó, tabelas, índices e estratégias em ordem;
+    # custos e estimativas ficam de fora para que só mudança real de plano conte
+    shape = [(n.get("Node Type"), n.get("Relation Name"), n.get("Index Name"), n.get("Join Type"),
+              n.get("Strategy"), len(n.get("Plans", ()))) for n in walk(plan["Plan"])]
+    return hashlib.sha1(json.dumps(shape).encode()).hexdigest()[:12]
+
+
+def _rows(node):
+    # Linhas por execução do nó: reais quando houver ANALYZE, estimadas caso contrário
+    return node.get("Actual Rows", node.get("Plan Rows", 0))
+
+
+def _misestimated(est, actual):
+    ratio = max(est, 1) / max(actual, 1)
+    return max(est, actual) >= MISESTIMATE_MIN and (ratio >= MISESTIMATE_RATIO or ratio <= 1 / MISESTIMATE_RATIO)
+
+
+def _finding(kind, severity, node, detail):
+    return {"tipo": kind, "severidade": severity, "no": node.get("Node Type"),
+            "relacao": node.get("Relation Name"), "detalhe": detail}
+
+
+def analyze_plan(plan, reltuples=None, work_mem=None, rows_per_call=None):
+    reltuples = reltuples or {}
+    found = []
+    root = plan["Plan"]
+    for node in walk(root):
+        kind = node.get("Node Type")
+
+        if kind == "Seq Scan":
+            table_rows = reltuples.get(node.get("Relation Name"), 0)
+            if table_rows >= LARGE_TABLE_ROWS:
+                where = f", filtro {node['Filter']}" if node.get("Filter") else ""
+                found.append(_finding("seq_scan", "critical" if node.get("Filter") else "warning", node,
+                                      f"Seq Scan em {node['Relation Name']} (~{table_rows:,.0f} linhas{where})"))
+
+        if "Actual Rows" in node:
+            est, act = node.get("Plan Rows", 0), node["Actual Rows"]
+            if _misestimated(est, act):
+                found.append(_finding("estimativa", "warning", node,
+                                      f"{kind}: {est:,.0f} linhas estimadas, {act:,.0f} reais"))
+
+        if kind == "Sort":
+            if node.get("Sort Space Type") == "Disk":
+                found.append(_finding("sort_disco", "critical", node,
+                                      f"Sort em disco ({node.get('Sort Space Used', 0):,} kB)"))
+            elif "Actual Rows" not in node and work_mem:
+                size = node.get("Plan Rows", 0) * node.get("Plan Width", 0)
+                if size > work_mem:
+                    found.append(_finding("sort_disco", "warning", node,
+                                          f"Sort de ~{size / 2**20:,.0f} MB estimados, work_mem {work_mem / 2**20:,.0f} MB"))
+        if kind == "Hash" and node.get("Hash Batches", 1) > 1:
+            found.append(_finding("hash_disco", "warning", node,
+                                  f"Hash em {node['Hash Batches']} lotes (não coube em memória)"))
+
+        if kind == "Nested Loop" and len(node.get("Plans", ())) == 2:
+            outer, inner = node["Plans"]
+            loops = inner.get("Actual Loops") or _rows(outer)
+            work = loops * _rows(inner)
+            if loops >= NESTED_LOOP_LOOPS and (inner.get("Node Type") not in INDEXED or work >= NESTED_LOOP_WORK):
+                target = inner.get("Relation Name") or inner.get("Node Type")
+                found.append(_finding("nested_loop", "critical" if inner.get("Node Type") == "Seq Scan" else "warning",
+                                      node, f"Nested Loop com ~{loops:,.0f} iterações sobre {target} (~{work:,.0f} linhas)"))
+
+    # Sem ANALYZE: a raiz estimada contra a média real de pg_stat_statements
+    if "Actual Rows" not in root and rows_per_call is not None and root.get("Node Type") != "ModifyTable":
+        est = root.get("Plan Rows", 0)
+        if _misestimated(est, rows_per_call):
+            found.append(_finding("estimativa", "warning", root,
+                                  f"{est:,.0f} linhas estimadas, {rows_per_call:,.0f} em média por chamada"))
+    return found
+
+
+# --- CACHE DE PLANOS ---
+class PlanCache:
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path        = path
+        self._entries    = OrderedDict()    # fingerprint -> dict
+        self._lock       = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._entries.update(json.load(f))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def update(self, key, query, plan, findings):
+        # Guarda o plano novo; devolve a mudança em relação ao anterior (ou None)
+        sig, cost, now = signature(plan), plan["Plan"].get("Total Cost", 0.0), time.time()
+        with self._lock:
+            old = self._entries.get(key)
+            changed = old is not None and old["assinatura"] != sig
+            # A última mudança fica registrada até o plano mudar de novo
+            change = old.get("mudanca") if old else None
+            if changed:
+                change = {"em": now, "assinatura_antes": old["assinatura"], "assinatura_depois": sig,
+                          "custo_antes": old["custo"], "custo_depois": cost,
+                          "regressao": cost > old["custo"] * (1 + REGRESSION_RATIO)}
+            self._entries[key] = {"query": query, "assinatura": sig, "custo": cost, "plano": plan,
+                                  "achados": findings, "analisado_em": now, "mudanca": change}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._save_locked()
+            return change if changed else None
+
+    def _save_locked(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f, default=str)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _fetch_dicts(cur, sql, params):
+    cur.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur.fetchall()]
+
+
+class PlanAnalyzer:
+    def __init__(self, cache=None, top_n=5, min_calls=5, min_active_ms=1000, timeout_ms=2000, ttl=600.0,
+                 analyze=False, change_window=86400.0):
+        self.cache         = cache if cache is not None else PlanCache()
+        self.top_n         = top_n
+        self.min_calls     = min_calls
+        self.min_active_ms = min_active_ms
+        self.timeout_ms    = timeout_ms
+        self.ttl           = ttl           # reusa o plano do cache por este tempo
+        self.analyze       = analyze
+        self.change_window = change_window # por quanto tempo uma mudança de plano é reportada
+        self.last          = None          # (time.time(), relatórios) da última análise
+        self.explains      = 0
+
+    def _recent(self, change):
+        if change and time.time() - change["em"] < self.change_window:
+            return change
+        return None
+
+    def slow_statements(self, conn):
+        with conn.cursor() as cur:
+            try:
+                rows = _fetch_dicts(cur, SLOW_STATEMENTS_SQL, {"min_calls": self.min_calls, "limit": self.top_n * 3})
+                source = "pg_stat_statements"
+            except (errors.UndefinedTable, errors.UndefinedColumn, errors.ObjectNotInPrerequisiteState):
+                # Sem pg_stat_statements, ou anterior ao PG13 (sem total_exec_time/mean_exec_time)
+                if not conn.autocommit:
+                    conn.rollback()
+                rows = _fetch_dicts(cur, ACTIVE_STATEMENTS_SQL, {"min_ms": self.min_active_ms, "limit": self.top_n * 3})
+                source = "pg_stat_activity"
+        # Um por fingerprint (no pg_stat_activity a mesma consulta aparece com literais diferentes)
+        picked = OrderedDict()
+        for row in rows:
+            picked.setdefault(fingerprint(row["query"]), dict(row, fonte=source))
+        return list(picked.items())[: self.top_n]
+
+    def run(self, conn, deadline=None):
+        # deadline (time.monotonic): cada EXPLAIN recebe no máximo o que resta dele
+        # como statement_timeout; sem tempo, as consultas restantes ficam com erro
+        statements = self.slow_statements(conn)
+        with conn.cursor() as cur:
+            cur.execute(WORK_MEM_SQL)
+            work_mem = cur.fetchone()[0]
+        reports = []
+        for fp, row in statements:
+            key = hashlib.sha1(fp.encode()).hexdigest()[:16]
+            report = {"fingerprint": key, "query": fp[:300], "fonte": row["fonte"], "chamadas": row["calls"],
+                      "media_ms": row["mean_ms"], "custo": None, "achados": [], "mudanca": None, "erro": None}
+            cached = self.cache.get(key)
+            if cached and time.time() - cached["analisado_em"] < self.ttl:
+                report.update(custo=cached["custo"], achados=cached["achados"], mudanca=self._recent(cached["mudanca"]))
+                reports.append(report)
+                continue
+            timeout_ms = self.timeout_ms
+            if deadline is not None:
+                timeout_ms = min(timeout_ms, int(1000 * (deadline - time.monotonic())))
+                if timeout_ms <= 0:
+                    report["erro"] = "sem tempo para o EXPLAIN (prazo esgotado)"
+                    reports.append(report)
+                    continue
+            try:
+                plan = explain(conn, row["query"], timeout_ms, self.analyze)
+                self.explains += 1
+                tables = relations(plan)
+                reltuples = {}
+                if tables:
+                    with conn.cursor() as cur:
+                        cur.execute(RELTUPLES_SQL, (tables,))
+                        reltuples = dict(cur.fetchall())
+                findings = analyze_plan(plan, reltuples, work_mem, row.get("rows_per_call"))
+                self.cache.update(key, fp, plan, findings)
+                entry = self.cache.get(key)
+                report.update(custo=entry["custo"], achados=findings, mudanca=self._recent(entry["mudanca"]))
+            except (psycopg2.Error, ValueError) as e:
+                report["erro"] = str(e).strip().splitlines()[0]
+            reports.append(report)
+        self.last = (time.time(), reports)
+        return reports
+
+
+def plan_lines(reports):
+    # Uma linha por consulta para o contexto do diagnóstico; regressões primeiro. Os
+    # números vão arredondados (context.coarse) e a ordem sai deles: o texto faz
+    # parte da chave do cache do diagnóstico e não pode mudar a cada fetch_plans
+    def weight(r):
+        change = r.get("mudanca") or {}
+        return (not change.get("regressao"), -len(r["achados"]), -float(f"{r['media_ms'] or 0:.2g}"), r["query"])
+    lines = []
+    for r in sorted(reports, key=weight):
+        if r["erro"]:
+            continue
+        notes = [a["detalhe"] for a in r["achados"]]
+        change = r.get("mudanca")
+        if change:
+            label = "REGRESSÃO DE PLANO" if change["regressao"] else "plano mudou"
+            notes.insert(0, f"{label}: custo {change['custo_antes']:,.0f} → {change['custo_depois']:,.0f}")
+        if not notes:
+            notes = ["plano sem problemas aparentes"]
+        lines.append(f"- média {coarse(r['media_ms'])}ms | {coarse(r['chamadas'])} chamadas | custo {coarse(r['custo'])}: "
+                     f"{r['query'][:160]} → {'; '.join(notes)}")
+    return lines
@@ -0,0 +1,233 @@
+"""
+Pool de conexões psycopg2 com verificação de saúde a cada checkout.
+
+Substitui a conexão única em cache: cada sessão pega uma conexão emprestada,
+conexões derrubadas pelo pooler do Supabase são descartadas e recriadas
+com backoff, e o tempo de espera por conexão fica registrado em stats().
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+from sentinel import tracing
+
+
+class PoolError(Exception):
+    pass
+
+
+class PoolTimeout(PoolError):
+    pass
+
+
+@contextmanager
+def read_only(conn, timeout_ms):
+    # Transação READ ONLY com statement_timeout local: o limite não vaza para a
+    # sessão (no pooler em modo transação ela é de outro cliente depois)
+    autocommit = conn.autocommit
+    if not autocommit:
+        conn.rollback()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("BEGIN TRANSACTION READ ONLY")
+            try:
+                cur.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+                yield cur
+            finally:
+                cur.execute("ROLLBACK")
+    finally:
+        conn.autocommit = autocommit
+
+
+class ConnectionPool:
+    def __init__(self, connect, minconn=1, maxconn=10, timeout=10.0,
+                 ping_after=5.0, retries=3, backoff=0.5, backoff_max=8.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("minconn/maxconn inválidos")
+        self._connect_fn = connect
+        self.minconn     = minconn
+        self.maxconn     = maxconn
+        self.timeout     = timeout
+        self.ping_after  = ping_after
+        self.retries     = retries
+        self.backoff     = backoff
+        self.backoff_max = backoff_max
+
+        self._cond   = threading.Condition()
+        self._idle   = deque()          # (conn, devolvida_em)
+        self._in_use = set()
+        self._opening = 0
+        self._closed = False
+
+        self._waits      = deque(maxlen=1000)
+        self._checkouts  = 0
+        self._timeouts   = 0
+        self._opened     = 0
+        self._discarded  = 0
+        self._failures   = 0
+
+        for _ in range(minconn):
+            try:
+                self._idle.append((self._open(), time.monotonic()))
+            except psycopg2.Error:
+                # Banco fora do ar na subida: o pool abre sob demanda depois
+                break
+
+    # --- ABERTURA COM BACKOFF ---
+    def _open(self):
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self._connect_fn()
+                self._opened += 1
+                return conn
+            except psycopg2.OperationalError:
+                self._failures += 1
+                if attempt == self.retries:
+                    raise
+                time.sleep(delay * (0.5 + random.random() / 2))
+                delay = min(delay * 2, self.backoff_max)
+
+    def _is_alive(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._discarded += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    # --- CHECKOUT / DEVOLUÇÃO ---
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("pool fechado")
+                    if self._idle:
+                        conn, since = self._idle.pop()
+                        self._in_use.add(conn)
+                        break
+                    if len(self._in_use) + self._opening < self.maxconn:
+                        conn, since = None, None
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"nenhuma conexão livre em {timeout:.1f}s")
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use.add(conn)
+                break
+
+            if self._is_alive(conn, time.monotonic() - since):
+                break
+            # Conexão morta: descarta e tenta de novo (abre outra se preciso)
+            with self._cond:
+                self._in_use.discard(conn)
+                self._cond.notify()
+            self._discard(conn)
+
+        with self._cond:
+            self._checkouts += 1
+            self._waits.append(time.monotonic() - started)
+        return conn
+
+    def putconn(self, conn, discard=False):
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        discard = discard or bool(conn.closed)
+
+        with self._cond:
+            self._in_use.discard(conn)
+            keep = not discard and not self._closed
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        with tracing.span("db.getconn"):
+            conn = self.getconn(timeout)
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self.putconn(conn, discard=True)
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        else:
+            self.putconn(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [c for c, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    # --- MÉTRICAS ---
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            data = {
+                "size":       len(self._idle) + len(self._in_use),
+                "idle":       len(self._idle),
+                "in_use":     len(self._in_use),
+                "maxconn":    self.maxconn,
+                "checkouts":  self._checkouts,
+                "timeouts":   self._timeouts,
+                "opened":     self._opened,
+                "discarded":  self._discarded,
+                "failures":   self._failures,
+            }
+        if waits:
+            data["wait_ms_avg"] = 1000 * sum(waits) / len(waits)
+            data["wait_ms_p95"] = 1000 * waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+            data["wait_ms_max"] = 1000 * waits[-1]
+        return data
@@ -0,0 +1,177 @@
+"""
+Explorador de pg_stat_activity.
+
+Filtros, ordenação e paginação por keyset rodam no servidor; só uma prévia
+curta de cada query é enviada e a duração vem como número (ms), pronta para
+ordenar e agregar com NumPy. As queries também são normalizadas em
+"fingerprints" (literais e listas IN trocados por ?) e agrupadas, para mostrar
+qual formato de comando está ocupando as conexões.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from sentinel.columnar import read_frame
+
+STATES = ["active", "idle in transaction", "idle in transaction (aborted)",
+          "fastpath function call", "disabled", "idle"]
+BUSY_STATES = tuple(s for s in STATES if s != "idle")
+
+# Duração em ms (float8): ordenável, filtrável e agregável sem reparse de texto
+DURATION_MS = "extract(epoch FROM now() - query_start)::float8 * 1000"
+
+# Faixas do histograma de duração (ms)
+DURATION_EDGES  = np.array([10, 100, 1_000, 10_000, 60_000, 300_000, 3_600_000], dtype="float64")
+DURATION_LABELS = ["<10ms", "10-100ms", "100ms-1s", "1-10s", "10s-1min", "1-5min", "5min-1h", ">1h"]
+
+WAIT_EVENT_TYPES = ["Activity", "BufferPin", "Client", "Extension", "IO", "IPC", "Lock", "LWLock", "Timeout"]
+
+# Ordenação: expressão da chave (sem NULL, para o keyset funcionar) e direção
+SORTS = {
+    "duração":  ("coalesce(query_start, 'infinity'::timestamptz)", "ASC"),
+    "pid":      ("pid", "ASC"),
+    "usuário":  ("coalesce(usename::text, '')", "ASC"),
+}
+
+# Normalização de query; as mesmas regras em SQL (servidor) e em Python.
+# Comentários ficam em chamadas separadas: no Postgres um RE com | é sempre guloso
+_FP_SQL = r"""
+    regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace(
+        query,
+        '--[^\n]*', ' ', 'g'),
+        '/\*.*?\*/', ' ', 'g'),
+        '''(?:[^'']|'''')*''', '?', 'g'),
+        '\$\d+', '?', 'g'),
+        '\m\d+(?:\.\d+)?\M', '?', 'g'),
+        '\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?)', 'g'),
+        '\s+', ' ', 'g')
+"""
+
+_FP_RULES = [
+    (re.compile(r"--[^\n]*"), " "),
+    (re.compile(r"/\*.*?\*/", re.S), " "),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(query):
+    for pattern, repl in _FP_RULES:
+        query = pattern.sub(repl, query)
+    return query.strip()
+
+
+def _filters(states=None, user=None, min_duration=None, wait_event_type=None, wait_event=None):
+    where, params = ["pid <> pg_backend_pid()"], []
+    if states:
+        where.append("state IN %s")
+        params.append(tuple(states))
+    if user:
+        where.append("usename = %s")
+        params.append(user)
+    if min_duration:
+        where.append("now() - query_start >= %s")
+        params.append(min_duration)
+    if wait_event_type:
+        where.append("wait_event_type = %s")
+        params.append(wait_event_type)
+    if wait_event:
+        where.append("wait_event = %s")
+        params.append(wait_event)
+    return where, params
+
+
+def build_process_query(filters=None, sort="duração", after=None, limit=50, preview_chars=120):
+    # `after` é a chave (valor de ordenação como texto, pid) da última linha da
+    # página anterior; o texto volta como literal e o Postgres converte o tipo
+    key_expr, direction = SORTS[sort]
+    where, params = _filters(**(filters or {}))
+    if after is not None:
+        op = ">" if direction == "ASC" else "<"
+        where.append(f"({key_expr}, pid) {op} (%s, %s)")
+        params.extend(after)
+    sql = f"""
+        SELECT pid, usename AS usuario, state AS status, backend_type,
+               wait_event_type, wait_event,
+               {DURATION_MS} AS duracao_ms,
+               query_start, xact_start, state_change,
+               left(regexp_replace(coalesce(query, ''), '\\s+', ' ', 'g'), {int(preview_chars)}) AS query,
+               {key_expr}::text AS sort_key
+        FROM pg_stat_activity
+        WHERE {' AND '.join(where)}
+        ORDER BY {key_expr} {direction}, pid {direction}
+        LIMIT %s
+    """
+    params.append(int(limit))
+    return sql, tuple(params)
+
+
+def build_fingerprint_query(filters=None, limit=20, preview_chars=160):
+    where, params = _filters(**(filters or {}))
+    sql = f"""
+        SELECT left(fp, {int(preview_chars)}) AS fingerprint,
+               count(*) AS sessoes,
+               count(*) FILTER (WHERE state = 'active') AS ativas,
+               count(*) FILTER (WHERE state LIKE 'idle in transaction%%') AS idle_tx,
+               max({DURATION_MS}) AS maior_duracao_ms
+        FROM (
+            SELECT state, query_start, {_FP_SQL} AS fp
+            FROM pg_stat_activity
+            WHERE query <> '' AND {' AND '.join(where)}
+        ) s
+        GROUP BY fp
+        ORDER BY count(*) DESC, fp
+        LIMIT %s
+    """
+    params.append(int(limit))
+    return sql, tuple(params)
+
+
+def fetch_processes(conn, filters=None, sort="duração", after=None, limit=50):
+    # Devolve a página e a chave para buscar a próxima (None na última página)
+    sql, params = build_process_query(filters, sort, after, limit + 1)
+    page = read_frame(conn, sql, params)
+    next_after = None
+    if len(page) > limit:
+        page = page.iloc[:limit]
+        last = page.iloc[-1]
+        next_after = (str(last["sort_key"]), int(last["pid"]))
+    return page.drop(columns=["sort_key"]), next_after
+
+
+def fetch_fingerprints(conn, filters=None, limit=20):
+    sql, params = build_fingerprint_query(filters, limit)
+    return read_frame(conn, sql, params)
+
+
+def build_duration_query(filters=None):
+    # Só as colunas numéricas: barato mesmo com milhares de sessões
+    where, params = _filters(**(filters or {}))
+    sql = f"""
+        SELECT pid, state AS status, {DURATION_MS} AS duracao_ms
+        FROM pg_stat_activity
+        WHERE query_start IS NOT NULL AND {' AND '.join(where)}
+    """
+    return sql, tuple(params)
+
+
+def fetch_durations(conn, filters=None):
+    sql, params = build_duration_query(filters)
+    return read_frame(conn, sql, params)
+
+
+def duration_histogram(durations_ms):
+    values = np.asarray(durations_ms, dtype="float64")
+    values = values[~np.isnan(values)]
+    counts = np.bincount(np.searchsorted(DURATION_EDGES, values, side="right"),
+                         minlength=len(DURATION_LABELS))
+    return pd.DataFrame({"faixa": DURATION_LABELS, "sessoes": counts})
+
+
+def longest_running(durations, n=10):
+    return durations.nlargest(n, "duracao_ms")
@@ -0,0 +1,93 @@
+"""
+Buffer circular colunar (NumPy) com capacidade fixa.
+
+append() grava só as linhas novas, descartando as mais antigas quando o
+buffer enche. frame() monta o DataFrame uma vez por alteração, com cópias
+vetorizadas das colunas, e reaproveita o resultado enquanto nada mudar.
+
+Remontar custa O(capacity) a cada append: o frame devolvido é compartilhado
+(snapshots do coletor, caches) e não pode ser uma view que o próximo append
+sobrescreveria. Com a janela ao vivo (LIVE_WINDOW, ~20 linhas) quem domina é o
+custo fixo do pandas, ~1ms por remontagem; só vale trocar por um frame estendido
+de forma incremental se a capacidade passar de dezenas de milhares de linhas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity deve ser >= 1")
+        self.capacity = capacity
+        self._cols  = None      # nome -> np.ndarray(capacity)
+        self._tz    = {}        # colunas de data com fuso (guardadas em UTC ingênuo)
+        self._start = 0
+        self._size  = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._size
+
+    def _allocate(self, frame):
+        self._cols = {}
+        for name in frame.columns:
+            s = frame[name]
+            if isinstance(s.dtype, pd.DatetimeTZDtype):
+                self._tz[name] = s.dt.tz
+                dtype = "datetime64[ns]"
+            elif pd.api.types.is_datetime64_any_dtype(s.dtype):
+                dtype = "datetime64[ns]"
+            elif pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+                dtype = "float64"
+            else:
+                dtype = object
+            self._cols[name] = np.empty(self.capacity, dtype=dtype)
+
+    def _values(self, s, arr):
+        if s.name in self._tz:
+            s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+        if arr.dtype == np.float64:
+            return s.to_numpy(dtype="float64", na_value=np.nan)
+        return s.to_numpy(dtype=arr.dtype)
+
+    def append(self, frame):
+        # `frame` em ordem cronológica (mais antiga primeiro)
+        if frame.empty:
+            return
+        frame = frame.iloc[-self.capacity:]
+        if self._cols is None:
+            self._allocate(frame)
+        n   = len(frame)
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        for name, arr in self._cols.items():
+            values = self._values(frame[name], arr)
+            arr[end:end + first] = values[:first]
+            arr[:n - first] = values[first:]
+        overflow = max(0, self._size + n - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size  = min(self.capacity, self._size + n)
+        self._frame = None
+
+    def frame(self, newest_first=True):
+        if self._frame is not None and self._frame[0] == newest_first:
+            return self._frame[1]
+        if self._cols is None:
+            return pd.DataFrame()
+        stop = self._start + self._size
+        data = {}
+        for name, arr in self._cols.items():
+            if stop <= self.capacity:
+                values = arr[self._start:stop].copy()
+            else:
+                values = np.concatenate((arr[self._start:], arr[:stop - self.capacity]))
+            if newest_first:
+                values = values[::-1]
+            if name in self._tz:
+                values = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(self._tz[name])
+            data[name] = values
+        frame = pd.DataFrame(data)
+        self._frame = (newest_first, frame)
+        return frame
@@ -0,0 +1,288 @@
+"""
+Amostrador de telemetria: grava db_metrics_history a partir do próprio banco.
+
+Cada amostra é uma única consulta aos contadores cumulativos de
+pg_stat_database, pg_stat_activity e pg_stat_statements; as métricas saem das
+diferenças entre duas amostras. As linhas ficam num buffer local e são
+gravadas em lote (execute_values, ou COPY quando o atraso acumulado é grande),
+então amostrar a cada 1s não custa um round-trip por métrica. Se o banco de
+destino cair, o buffer segura as linhas até a próxima gravação dar certo.
+
+Uso isolado:  python -m sentinel.sampler --interval 1 --cpus 2 [--maintain]
+"""
+
+import argparse
+import csv
+import io
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
+from sentinel import schema
+from sentinel.pool import ConnectionPool, PoolError
+
+COLUMNS = ("timestamp", "cpu_usage", "active_connections", "avg_latency_ms", "slow_queries_count")
+
+STATEMENTS_SQL = """
+    (SELECT sum(calls)::float8 FROM pg_stat_statements) AS calls,
+    (SELECT sum(total_exec_time)::float8 FROM pg_stat_statements) AS exec_ms
+"""
+
+# active_time só existe a partir do PG 14; via to_jsonb a coluna ausente vira NULL
+SAMPLE_SQL = """
+    SELECT clock_timestamp() AS ts,
+           (SELECT count(*) FROM pg_stat_activity
+             WHERE backend_type = 'client backend' AND state <> 'idle' AND pid <> pg_backend_pid()) AS active_connections,
+           (SELECT count(*) FROM pg_stat_activity
+             WHERE state = 'active' AND wait_event IS NULL AND pid <> pg_backend_pid()) AS running,
+           (SELECT count(*) FROM pg_stat_activity
+             WHERE state = 'active' AND pid <> pg_backend_pid()
+               AND now() - query_start >= %(slow_ms)s * interval '1 millisecond') AS slow_queries_count,
+           (SELECT sum((to_jsonb(d) ->> 'active_time')::float8) FROM pg_stat_database d) AS active_time_ms,
+           {statements}
+"""
+
+INSERT_SQL = 'INSERT INTO db_metrics_history ("timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count) VALUES %s'
+COPY_SQL   = 'COPY db_metrics_history ("timestamp", cpu_usage, active_connections, avg_latency_ms, slow_queries_count) FROM STDIN WITH (FORMAT csv)'
+
+
+def _delta(new, old):
+    # None quando o contador não existe ou foi zerado (pg_stat_reset)
+    if new is None or old is None or new < old:
+        return None
+    return new - old
+
+
+def derive_row(prev, cur, cpus=1):
+    # Uma linha de db_metrics_history a partir de duas amostras consecutivas
+    wall_ms = (cur["ts"] - prev["ts"]).total_seconds() * 1000
+    active  = _delta(cur["active_time_ms"], prev["active_time_ms"])
+    if active is not None and wall_ms > 0:
+        cpu = 100.0 * active / (wall_ms * cpus)
+    else:
+        # Sem active_time: sessões ativas fora de espera ocupam uma CPU cada
+        cpu = 100.0 * cur["running"] / cpus
+    calls   = _delta(cur["calls"], prev["calls"])
+    exec_ms = _delta(cur["exec_ms"], prev["exec_ms"])
+    latency = exec_ms / calls if calls and exec_ms is not None else None
+    return (cur["ts"], round(min(max(cpu, 0.0), 100.0), 2), int(cur["active_connections"]),
+            None if latency is None else round(latency, 3), int(cur["slow_queries_count"]))
+
+
+class Sampler:
+    def __init__(self, source, sink=None, interval=1.0, cpus=1, slow_ms=1000,
+                 flush_every=10.0, batch_size=500, copy_threshold=1000, buffer_max=86_400,
+                 maintain=None, maintain_every=60.0):
+        self.source = source            # ConnectionPool do banco monitorado
+        self.sink   = sink or source    # ConnectionPool onde fica db_metrics_history
+        self.interval       = interval
+        self.cpus           = max(1, cpus)
+        self.slow_ms        = slow_ms
+        self.flush_every    = flush_every
+        self.batch_size     = batch_size
+        self.copy_threshold = copy_threshold
+        self.maintain       = maintain  # ex.: schema.maintain, roda com uma conexão do sink
+        self.maintain_every = maintain_every
+        self._buffer = deque(maxlen=buffer_max)   # cheio: descarta as amostras mais antigas
+        self._prev   = None
+        self._statements = True
+        self._lock   = threading.Lock()
+        self._stop   = threading.Event()
+        self._thread = None
+        self.samples = self.written = self.dropped = self.sample_errors = self.flush_errors = 0
+        self.maintain_errors = 0
+        self.last_error = None
+
+    # --- AMOSTRAGEM ---
+    def _query(self, conn):
+        with conn.cursor() as cur:
+            if self._statements:
+                try:
+                    cur.execute(SAMPLE_SQL.format(statements=STATEMENTS_SQL), {"slow_ms": self.slow_ms})
+                except (errors.UndefinedTable, errors.UndefinedColumn, errors.ObjectNotInPrerequisiteState):
+                    # Sem pg_stat_statements (ou versão antiga): latência fica NULL
+                    if not conn.autocommit:
+                        conn.rollback()
+                    self._statements = False
+            if not self._statements:
+                cur.execute(SAMPLE_SQL.format(statements="NULL::float8 AS calls, NULL::float8 AS exec_ms"),
+                            {"slow_ms": self.slow_ms})
+            names = [d[0] for d in cur.description]
+            return dict(zip(names, cur.fetchone()))
+
+    def sample_once(self):
+        try:
+            with self.source.connection() as conn:
+                cur = self._query(conn)
+        except (psycopg2.Error, PoolError) as e:
+            self.sample_errors += 1
+            self.last_error = str(e).strip() or e.__class__.__name__
+            return None
+        prev, self._prev = self._prev, cur
+        if prev is None:
+            return None
+        row = derive_row(prev, cur, self.cpus)
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(row)
+            self.samples += 1
+        return row
+
+    # --- GRAVAÇÃO EM LOTE ---
+    def _copy(self, cur, rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(["" if v is None else v.isoformat() if hasattr(v, "isoformat") else v for v in row])
+        buf.seek(0)
+        cur.copy_expert(COPY_SQL, buf)
+
+    def flush(self):
+        # Cada lote é um único comando, então ou entra inteiro ou volta para o
+        # buffer; com autocommit isso evita linhas duplicadas no retry
+        written = 0
+        while True:
+            with self._lock:
+                pending = len(self._buffer)
+                if not pending:
+                    return written
+                use_copy = pending >= self.copy_threshold
+                size = pending if use_copy else min(pending, self.batch_size)
+                rows = list(islice(self._buffer, size))
+            try:
+                with self.sink.connection() as conn:
+                    with conn.cursor() as cur:
+                        if use_copy:
+                            self._copy(cur, rows)
+                        else:
+                            execute_values(cur, INSERT_SQL, rows, page_size=len(rows))
+                    if not conn.autocommit:
+                        conn.commit()
+            except (psycopg2.Error, PoolError) as e:
+                self.flush_errors += 1
+                self.last_error = str(e).strip() or e.__class__.__name__
+                return written
+            with self._lock:
+                # As gravadas estão no começo do buffer, exceto as que o maxlen
+                # já descartou enquanto gravávamos
+                done = set(map(id, rows))
+                while self._buffer and id(self._buffer[0]) in done:
+                    self._buffer.popleft()
+                self.written += size
+            written += size
+
+    def run_maintenance(self):
+        try:
+            with self.sink.connection() as conn:
+                return self.maintain(conn)
+        except (psycopg2.Error, PoolError) as e:
+            self.maintain_errors += 1
+            self.last_error = str(e).strip() or e.__class__.__name__
+            return None
+
+    # --- LAÇO ---
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-sentinel-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        next_at = last_flush = time.monotonic()
+        last_maintain = None
+        while not self._stop.is_set():
+            self.sample_once()
+            now = time.monotonic()
+            if now - last_flush >= self.flush_every or self.pending >= self.batch_size:
+                self.flush()
+                last_flush = now
+            if self.maintain is not None and (last_maintain is None or now - last_maintain >= self.maintain_every):
+                # Depois do flush: os rollups já incluem as linhas recém-gravadas
+                self.run_maintenance()
+                last_maintain = now
+            # Agenda pelo relógio e não pela duração da amostra, para não acumular atraso
+            next_at = max(next_at + self.interval, time.monotonic())
+            self._stop.wait(next_at - time.monotonic())
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+    def stats(self):
+        with self._lock:
+            return {"samples": self.samples, "written": self.written, "pending": len(self._buffer),
+                    "dropped": self.dropped, "sample_errors": self.sample_errors,
+                    "flush_errors": self.flush_errors, "maintain_errors": self.maintain_errors,
+                    "last_error": self.last_error}
+
+
+# --- EXECUÇÃO ISOLADA ---
+def _load_secrets(path):
+    try:
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except (OSError, ImportError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Amostrador do DB Sentinel (grava db_metrics_history)")
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos entre amostras")
+    parser.add_argument("--cpus", type=int, default=1, help="vCPUs do servidor, para a CPU em %%")
+    parser.add_argument("--slow-ms", type=float, default=1000, help="duração a partir da qual uma query é lenta")
+    parser.add_argument("--flush-every", type=float, default=10.0, help="segundos entre gravações em lote")
+    parser.add_argument("--maintain", action="store_true",
+                        help="aplica sentinel.schema (partições, rollups, retenção) e o mantém em dia")
+    parser.add_argument("--secrets", default=os.path.join(".streamlit", "secrets.toml"))
+    args = parser.parse_args(argv)
+
+    # Mesmos nomes dos secrets do dashboard; variáveis de ambiente têm prioridade
+    secrets = _load_secrets(args.secrets)
+    conf = {k: os.getenv(k, secrets.get(k)) for k in ("SUPABASE_HOST", "DB_NAME", "DB_USER", "DB_PASS", "DB_PORT")}
+
+    def connect():
+        conn = psycopg2.connect(host=conf["SUPABASE_HOST"], database=conf["DB_NAME"], user=conf["DB_USER"],
+                                password=conf["DB_PASS"], port=conf["DB_PORT"] or "6543", connect_timeout=10)
+        conn.autocommit = True
+        return conn
+
+    pool = ConnectionPool(connect, minconn=0, maxconn=2, timeout=10)
+    maintain = None
+    if args.maintain:
+        with pool.connection() as conn:
+            schema.migrate(conn)
+        maintain = schema.maintain
+    sampler = Sampler(pool, interval=args.interval, cpus=args.cpus, slow_ms=args.slow_ms,
+                      flush_every=args.flush_every, maintain=maintain)
+    sampler.start()
+    print(f"Amostrando {conf['SUPABASE_HOST']} a cada {args.interval}s (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(60)
+            print(sampler.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop(timeout=5)
+        pool.close()
+        print(sampler.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Schema de db_metrics_history: partições diárias, rollups e retenção.
+
+migrate() transforma a tabela em particionada por dia ("timestamp"); uma
+tabela comum já existente vira a partição inicial, sem copiar dados. O
+índice é btree em "timestamp": a janela ao vivo faz ORDER BY ... DESC LIMIT,
+que um BRIN não atende, e as partições diárias mantêm cada btree pequeno.
+
+migrate() pega locks ACCESS EXCLUSIVE: roda só pela linha de comando
+(python -m sentinel.sampler --maintain), nunca no dashboard, que apenas confere
+is_migrated(). maintain() roda periodicamente (ver Sampler): cria as partições dos próximos
+dias, recalcula os rollups de 1m/1h/1d (min/avg/max/p95) a partir das
+amostras brutas e apaga partições e rollups fora da retenção.
+
+A partição DEFAULT recebe as linhas de dias sem partição, então os INSERTs do
+amostrador (ou de outro gravador) seguem funcionando se a manutenção parar;
+quando o dia ganha partição, as linhas dele saem da DEFAULT.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from psycopg2 import errors
+
+from sentinel.history import METRIC_COLUMNS, RAW_RETENTION, ROLLUPS, raw_aggregates
+
+# Chave do advisory lock: dashboard e amostrador podem chamar ao mesmo tempo
+LOCK_KEY = 0x5e471e1
+
+PARTITION_SQL = """
+DO $$
+DECLARE
+    kind "char";
+    upper_bound timestamptz;
+BEGIN
+    SELECT relkind INTO kind FROM pg_class WHERE oid = to_regclass('db_metrics_history');
+    IF kind = 'p' THEN
+        RETURN;
+    ELSIF kind IS NULL THEN
+        CREATE TABLE db_metrics_history (
+            "timestamp"        timestamptz NOT NULL DEFAULT now(),
+            cpu_usage          float8,
+            active_connections integer,
+            avg_latency_ms     float8,
+            slow_queries_count integer
+        ) PARTITION BY RANGE ("timestamp");
+    ELSE
+        -- Tabela comum: vira a partição que cobre tudo até o fim do último dia com dados
+        ALTER TABLE db_metrics_history RENAME TO db_metrics_history_legacy;
+        CREATE TABLE db_metrics_history (LIKE db_metrics_history_legacy INCLUDING DEFAULTS)
+            PARTITION BY RANGE ("timestamp");
+        SELECT date_trunc('day', max("timestamp")) + interval '1 day' INTO upper_bound
+        FROM db_metrics_history_legacy;
+        EXECUTE format('ALTER TABLE db_metrics_history ATTACH PARTITION db_metrics_history_legacy '
+                       'FOR VALUES FROM (MINVALUE) TO (%L)', coalesce(upper_bound, date_trunc('day', now())));
+    END IF;
+END $$;
+CREATE INDEX IF NOT EXISTS db_metrics_history_timestamp_idx ON db_metrics_history ("timestamp");
+"""
+
+DEFAULT_PARTITION = "db_metrics_history_default"
+DEFAULT_PARTITION_SQL = f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF db_metrics_history DEFAULT;"
+
+# Um único comando (transação implícita): a partição do dia nasce fora da tabela,
+# recebe as linhas do dia que caíram na DEFAULT e só então é anexada; criar direto
+# com PARTITION OF falharia se a DEFAULT já tivesse linhas desse intervalo
+PARTITION_DAY_SQL = """
+CREATE TABLE {name} (LIKE db_metrics_history INCLUDING DEFAULTS);
+WITH moved AS (
+    DELETE FROM {default} WHERE "timestamp" >= %(lower)s AND "timestamp" < %(upper)s RETURNING *
+)
+INSERT INTO {name} SELECT * FROM moved;
+ALTER TABLE db_metrics_history ATTACH PARTITION {name} FOR VALUES FROM (%(lower)s) TO (%(upper)s);
+"""
+
+ROLLUP_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    bucket  timestamptz PRIMARY KEY,
+    samples integer NOT NULL,
+    {columns}
+);
+"""
+
+# Recalcula a partir do último balde (que pode estar incompleto) menos uma folga
+# alinhada ao balde, para pegar amostras que chegaram atrasadas do buffer do Sampler
+ROLLUP_REFRESH_SQL = """
+INSERT INTO {table} (bucket, samples, {names})
+SELECT date_bin(%(width)s, "timestamp", TIMESTAMPTZ '2000-01-01'), count(*),
+       {aggregates}
+FROM db_metrics_history
+WHERE "timestamp" >= coalesce(
+    date_bin(%(width)s, (SELECT max(bucket) FROM {table}) - %(lookback)s, TIMESTAMPTZ '2000-01-01'),
+    '-infinity')
+GROUP BY 1
+ON CONFLICT (bucket) DO UPDATE SET samples = EXCLUDED.samples, {updates}
+"""
+
+PARTITIONS_SQL = """
+SELECT c.relname,
+       (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'))[1]::timestamptz AS upper_bound
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'db_metrics_history'::regclass
+"""
+
+
+def _rollup_names(columns=METRIC_COLUMNS):
+    return [f"{c}{suffix}" for c in columns for suffix in ("_min", "", "_max", "_p95")]
+
+
+def migrate(conn):
+    # Um único comando (transação implícita): ou aplica tudo ou nada
+    statements = [f"SELECT pg_advisory_xact_lock({LOCK_KEY});", PARTITION_SQL, DEFAULT_PARTITION_SQL]
+    columns = ",\n    ".join(f"{name} float8" for name in _rollup_names())
+    for table, _, _ in ROLLUPS:
+        statements.append(ROLLUP_TABLE_SQL.format(table=table, columns=columns))
+    with conn.cursor() as cur:
+        cur.execute("\n".join(statements))
+    if not conn.autocommit:
+        conn.commit()
+
+
+def is_migrated(conn):
+    # Só leitura (pg_class), sem lock: o dashboard confere antes de manter o schema
+    with conn.cursor() as cur:
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('db_metrics_history')")
+        row = cur.fetchone()
+        cur.execute("SELECT count(to_regclass(t)) FROM unnest(%s::text[]) t", ([t for t, _, _ in ROLLUPS],))
+        rollups = cur.fetchone()[0]
+    return bool(row) and row[0] == "p" and rollups == len(ROLLUPS)
+
+
+def partition_name(day):
+    return f"db_metrics_history_p{day:%Y%m%d}"
+
+
+def ensure_partitions(conn, days_ahead=2, today=None):
+    today = today or datetime.now(timezone.utc).date()
+    created = []
+    with conn.cursor() as cur:
+        # Instalações migradas antes da partição DEFAULT
+        cur.execute(DEFAULT_PARTITION_SQL)
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            cur.execute("SELECT to_regclass(%s)", (partition_name(day),))
+            if cur.fetchone()[0] is not None:
+                continue
+            try:
+                cur.execute(PARTITION_DAY_SQL.format(name=partition_name(day), default=DEFAULT_PARTITION),
+                            {"lower": f"{day} 00:00:00+00", "upper": f"{day + timedelta(days=1)} 00:00:00+00"})
+            except (errors.InvalidObjectDefinition, errors.DuplicateTable):
+                # Dia já coberto pela partição herdada da tabela antiga, ou criado agora
+                # por outro processo (o dashboard e o amostrador podem manter ao mesmo tempo)
+                if not conn.autocommit:
+                    conn.rollback()
+                continue
+            created.append(partition_name(day))
+    if not conn.autocommit:
+        conn.commit()
+    return created
+
+
+def refresh_rollups(conn, lookback=timedelta(hours=1)):
+    names = _rollup_names()
+    aggregates = ",\n       ".join(raw_aggregates())
+    updates = ", ".join(f"{n} = EXCLUDED.{n}" for n in names)
+    rows = {}
+    with conn.cursor() as cur:
+        for table, width, _ in ROLLUPS:
+            cur.execute(ROLLUP_REFRESH_SQL.format(table=table, names=", ".join(names),
+                                                  aggregates=aggregates, updates=updates),
+                        {"width": width, "lookback": lookback})
+            rows[table] = cur.rowcount
+    if not conn.autocommit:
+        conn.commit()
+    return rows
+
+
+def apply_retention(conn, raw_retention=RAW_RETENTION):
+    dropped = []
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT relname FROM ({PARTITIONS_SQL}) p WHERE upper_bound <= now() - %s",
+                    (raw_retention,))
+        for (name,) in cur.fetchall():
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+            dropped.append(name)
+        # Dias que nunca ganharam partição ficam na DEFAULT até sair da retenção
+        cur.execute(f'DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" < now() - %s', (raw_retention,))
+        for table, _, retention in ROLLUPS:
+            if retention is not None:
+                cur.execute(f"DELETE FROM {table} WHERE bucket < now() - %s", (retention,))
+    if not conn.autocommit:
+        conn.commit()
+    return dropped
+
+
+def maintain(conn, days_ahead=2, raw_retention=RAW_RETENTION):
+    created = ensure_partitions(conn, days_ahead)
+    rollups = refresh_rollups(conn)
+    dropped = apply_retention(conn, raw_retention)
+    return {"created": created, "rollups": rollups, "dropped": dropped}
@@ -0,0 +1,156 @@
+"""
+Medição de tempo do caminho quente (spans).
+
+`with span("nome"):` mede com perf_counter_ns e guarda a duração numa janela
+móvel por nome, de onde saem p50/p95/p99. Desligado (o padrão), span()
+devolve um objeto vazio compartilhado: o custo fica em uma chamada de função.
+Exporta em texto Prometheus (summary) e, opcionalmente, grava cada span como
+uma linha JSON.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "started")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name   = name
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.rerun()/st.stop() saem por exceções de controle do Streamlit (BaseException,
+        # como GeneratorExit e KeyboardInterrupt): não contam como erro do span
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        self.tracer.record(self.name, (time.perf_counter_ns() - self.started) / 1e6, error)
+        return False
+
+
+class _Series:
+    __slots__ = ("window", "count", "errors", "total_ms", "max_ms")
+
+    def __init__(self, size):
+        self.window   = deque(maxlen=size)   # últimas durações (ms)
+        self.count    = 0
+        self.errors   = 0
+        self.total_ms = 0.0
+        self.max_ms   = 0.0
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return math.nan
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+    def __init__(self, enabled=False, window=1024, jsonl_path=None):
+        self.enabled = enabled
+        self.window  = window
+        self._series = {}
+        self._lock   = threading.Lock()
+        self._jsonl  = open(jsonl_path, "a", buffering=1) if jsonl_path else None
+
+    def span(self, name):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def record(self, name, ms, error=False):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series(self.window)
+            series.window.append(ms)
+            series.count    += 1
+            series.errors   += error
+            series.total_ms += ms
+            series.max_ms    = max(series.max_ms, ms)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps({"ts": time.time(), "span": name, "ms": round(ms, 3),
+                                              "error": bool(error), "thread": threading.current_thread().name}) + "\n")
+
+    def stats(self):
+        # Uma linha por span; quantis sobre a janela móvel, contagem e soma desde o início
+        with self._lock:
+            snapshot = [(name, sorted(s.window), s.count, s.errors, s.total_ms, s.max_ms)
+                        for name, s in self._series.items()]
+        rows = []
+        for name, ordered, count, errors, total, peak in snapshot:
+            rows.append({"span": name, "count": count, "errors": errors,
+                         "p50_ms": _quantile(ordered, 0.5), "p95_ms": _quantile(ordered, 0.95),
+                         "p99_ms": _quantile(ordered, 0.99), "max_ms": peak,
+                         "mean_ms": total / count if count else math.nan, "total_ms": total})
+        rows.sort(key=lambda r: -r["total_ms"])
+        return rows
+
+    def prometheus(self, prefix="db_sentinel_span"):
+        lines = [f"# HELP {prefix}_seconds Duração dos spans do DB Sentinel (janela móvel para os quantis)",
+                 f"# TYPE {prefix}_seconds summary"]
+        for row in self.stats():
+            label = row["span"].replace("\\", "\\\\").replace('"', '\\"')
+            for q, key in zip(QUANTILES, ("p50_ms", "p95_ms", "p99_ms")):
+                lines.append(f'{prefix}_seconds{{span="{label}",quantile="{q}"}} {row[key] / 1000:.6f}')
+            lines.append(f'{prefix}_seconds_sum{{span="{label}"}} {row["total_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_seconds_count{{span="{label}"}} {row["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+# Tracer do processo; os módulos usam tracing.span(...) direto
+tracer = Tracer()
+
+
+def configure(enabled=False, window=1024, jsonl_path=None):
+    global tracer
+    old, tracer = tracer, Tracer(enabled, window, jsonl_path)
+    old.close()   # spans ainda abertos no tracer antigo só deixam de ir para o arquivo
+    return tracer
+
+
+def span(name):
+    return tracer.span(name)
+
+
+def traced(name):
+    # Decorador; resolve o tracer a cada chamada, então vale depois de configure()
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
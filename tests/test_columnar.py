@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from sentinel.columnar import frame_from_rows
+
+TIMESTAMPTZ = 1184
+FLOAT8 = 701
+
+# America/Sao_Paulo em 2018: horário de verão começou em 04/11 (00:00 -03 -> 01:00 -02)
+BEFORE = timezone(timedelta(hours=-3))
+AFTER  = timezone(timedelta(hours=-2))
+
+
+def test_timestamptz_across_dst_boundary():
+    rows = [
+        (datetime(2018, 11, 3, 23, 59, tzinfo=BEFORE), 1.0),
+        (datetime(2018, 11, 4, 1, 1, tzinfo=AFTER), 2.0),
+    ]
+    frame = frame_from_rows(rows, [("timestamp", TIMESTAMPTZ), ("cpu_usage", FLOAT8)])
+    assert str(frame["timestamp"].dt.tz) == "UTC"
+    assert list(frame["timestamp"]) == [pd.Timestamp("2018-11-04 02:59", tz="UTC"),
+                                        pd.Timestamp("2018-11-04 03:01", tz="UTC")]
+
+
+def test_timestamptz_single_offset_keeps_session_zone():
+    rows = [(datetime(2018, 11, 3, 22, 0, tzinfo=BEFORE),), (datetime(2018, 11, 3, 23, 0, tzinfo=BEFORE),), (None,)]
+    frame = frame_from_rows(rows, [("timestamp", TIMESTAMPTZ)])
+    assert frame["timestamp"].iloc[0] == pd.Timestamp("2018-11-04 01:00", tz="UTC")
+    assert frame["timestamp"].iloc[0].utcoffset() == timedelta(hours=-3)
+    assert pd.isna(frame["timestamp"].iloc[2])
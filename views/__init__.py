@@ -0,0 +1,3 @@
+"""
+Telas do DB Sentinel (login, splash e dashboard), importadas sob demanda por app.py.
+"""
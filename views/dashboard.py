@@ -0,0 +1,636 @@
+"""
+Dashboard: KPIs, gráficos, diagnóstico com IA, processos e modo frota.
+
+Importado só depois do login. O cliente do Gemini é montado no primeiro
+diagnóstico (get_model), não na abertura da página.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+import pandas as pd
+import psycopg2
+import streamlit as st
+
+from sentinel.pool import ConnectionPool, PoolError
+from sentinel.collector import MetricsCollector
+from sentinel.cache import SWRCache, cache_key
+from sentinel.figures import FigureFactory, duration_figure
+from sentinel.diagnosis import DiagnosisService, diagnosis_job
+from sentinel.jobs import JobRunner, JobRejected, budget_ms
+from sentinel import history, context, processes, locks, schema, tracing, plans
+from sentinel.sampler import Sampler
+from sentinel.alerts import AlertEngine, default_rules
+from sentinel.notify import EmailNotifier, WebhookNotifier, missing_smtp
+from sentinel.fleet import FleetCollector, load_targets, HISTORY_SQL as FLEET_HISTORY_SQL
+
+# --- CREDENCIAIS (Configuradas via Streamlit Secrets) ---
+SUPABASE_HOST = st.secrets["SUPABASE_HOST"]
+DB_NAME       = st.secrets["DB_NAME"]
+DB_USER       = st.secrets["DB_USER"]
+DB_PASS       = st.secrets["DB_PASS"]
+DB_PORT       = str(st.secrets.get("DB_PORT", "6543"))
+GEMINI_KEY    = st.secrets.get("GEMINI_KEY", "")
+FAKE_LLM      = bool(st.secrets.get("FAKE_LLM", False))
+FAKE_DB       = bool(st.secrets.get("FAKE_DB", False))
+COLLECT_INTERVAL_S = float(st.secrets.get("COLLECT_INTERVAL_S", 5))
+CACHE_TTL_S        = float(st.secrets.get("CACHE_TTL_S", 2 * COLLECT_INTERVAL_S))
+LIVE_WINDOW        = int(st.secrets.get("LIVE_WINDOW", 20))
+PROC_PAGE_SIZE     = int(st.secrets.get("PROC_PAGE_SIZE", 50))
+DIAG_TTL_S         = float(st.secrets.get("DIAG_TTL_S", 300))
+DIAG_TIMEOUT_S     = float(st.secrets.get("DIAG_TIMEOUT_S", 90))
+DIAG_MAX_WORKERS   = int(st.secrets.get("DIAG_MAX_WORKERS", 2))
+DIAG_CONTEXT_TOKENS = int(st.secrets.get("DIAG_CONTEXT_TOKENS", 1500))
+PROJECT_REF        = "lbmmdvlxcpkgfnrhdgwt"
+FLEET_TARGETS      = load_targets(st.secrets.get("FLEET", []))
+FLEET_TIMEOUT_S    = float(st.secrets.get("FLEET_TIMEOUT_S", 5))
+SAMPLER_ENABLED    = bool(st.secrets.get("SAMPLER_ENABLED", False))
+SAMPLER_INTERVAL_S = float(st.secrets.get("SAMPLER_INTERVAL_S", 1))
+SAMPLER_CPUS       = int(st.secrets.get("SAMPLER_CPUS", 1))
+SCHEMA_MAINTAIN    = bool(st.secrets.get("SCHEMA_MAINTAIN", False))
+ALERT_COOLDOWN_S   = float(st.secrets.get("ALERT_COOLDOWN_S", 600))
+ALERT_EMAIL_TO     = st.secrets.get("ALERT_EMAIL_TO", "")
+ALERT_WEBHOOK_URL  = st.secrets.get("ALERT_WEBHOOK_URL", "")
+ALERT_THRESHOLDS   = dict(st.secrets.get("ALERT_THRESHOLDS", {}))
+PERF_TRACING       = bool(st.secrets.get("PERF_TRACING", False))
+PERF_JSONL         = st.secrets.get("PERF_JSONL", "")
+PLAN_TOP_N         = int(st.secrets.get("PLAN_TOP_N", 5))
+PLAN_TTL_S         = float(st.secrets.get("PLAN_TTL_S", 600))
+PLAN_TIMEOUT_MS    = int(st.secrets.get("PLAN_TIMEOUT_MS", 2000))
+PLAN_ANALYZE       = bool(st.secrets.get("PLAN_ANALYZE", False))
+PLAN_CACHE_PATH    = st.secrets.get("PLAN_CACHE_PATH", "")
+
+log = logging.getLogger("db_sentinel")
+
+# Spans desligados custam uma chamada de função; ligados, alimentam a aba PERF
+tracing.configure(enabled=PERF_TRACING, jsonl_path=PERF_JSONL or None)
+
+# --- MODELO ---
+@st.cache_resource
+def get_model():
+    # O SDK do Gemini leva ~1s para importar: só entra no primeiro diagnóstico
+    if FAKE_LLM:
+        from sentinel.fake_llm import FakeModel
+        return FakeModel()
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_KEY)
+    return genai.GenerativeModel('gemini-2.0-flash')
+
+
+# --- CONEXÃO ---
+def open_db_connection():
+    # FAKE_DB: dados sintéticos em memória (benchmarks de carga, demo sem banco)
+    connect = psycopg2.connect
+    if FAKE_DB:
+        from sentinel import fake_db
+        connect = fake_db.connect
+    conn = connect(host=SUPABASE_HOST, database=DB_NAME, user=DB_USER, password=DB_PASS, port=DB_PORT, connect_timeout=10)
+    conn.autocommit = True   # só leituras: não deixa sessões "idle in transaction" no pooler
+    return conn
+
+@st.cache_resource
+def get_db_pool():
+    return ConnectionPool(open_db_connection, minconn=1, maxconn=10, timeout=10)
+
+@st.cache_resource
+def get_sampler():
+    # Pool próprio: a amostragem não disputa conexões com os reruns do dashboard
+    pool = ConnectionPool(open_db_connection, minconn=0, maxconn=2, timeout=10)
+    maintain = None
+    if SCHEMA_MAINTAIN:
+        # Partições diárias, rollups 1m/1h/1d e retenção (ver sentinel.schema). A
+        # migração (DDL com ACCESS EXCLUSIVE) não roda aqui, no caminho de quem só
+        # está vendo o dashboard: aplique com python -m sentinel.sampler --maintain
+        try:
+            with pool.connection() as conn:
+                migrated = schema.is_migrated(conn)
+        except (psycopg2.Error, PoolError) as e:
+            log.warning("amostrador desligado: não foi possível conferir o schema (%s)", e)
+            pool.close()
+            return None
+        if migrated:
+            maintain = schema.maintain
+        else:
+            log.warning("schema de db_metrics_history não migrado; rode python -m sentinel.sampler --maintain")
+    sampler = Sampler(pool, interval=SAMPLER_INTERVAL_S, cpus=SAMPLER_CPUS, maintain=maintain)
+    sampler.start()
+    return sampler
+
+METRICS_KEY = cache_key(history.LIVE_SQL, (LIVE_WINDOW, "fingerprints"))
+
+@st.cache_resource
+def get_query_cache():
+    return SWRCache(ttl=CACHE_TTL_S)
+
+@st.cache_resource
+def get_alert_engine():
+    notifiers = []
+    if ALERT_EMAIL_TO and not missing_smtp(st.secrets):
+        notifiers.append(EmailNotifier(st.secrets, ALERT_EMAIL_TO, PROJECT_REF))
+    if ALERT_WEBHOOK_URL:
+        notifiers.append(WebhookNotifier(ALERT_WEBHOOK_URL, PROJECT_REF))
+    # A cada reinício o coletor entrega de novo a janela inteira: ela só aquece os detectores
+    return AlertEngine(default_rules(ALERT_THRESHOLDS), cooldown=ALERT_COOLDOWN_S, notifiers=notifiers,
+                       skip_backlog=True)
+
+@st.cache_resource
+def get_collector():
+    pool  = get_db_pool()
+    cache = get_query_cache()
+    alerts = get_alert_engine()
+    live  = history.IncrementalHistory(LIVE_WINDOW)
+    def poll():
+        with pool.connection() as conn:
+            # Resumo por formato de query das sessões não-idle, compartilhado entre sessões
+            return live.poll(conn), processes.fetch_fingerprints(conn, {"states": processes.BUSY_STATES})
+    def publish(snap):
+        cache.put(METRICS_KEY, snap)
+        # Alertas avaliados uma vez por amostra nova, mesmo sem ninguém olhando a tela
+        alerts.process_frame(snap.history)
+    collector = MetricsCollector(poll, interval=COLLECT_INTERVAL_S, on_publish=publish)
+    collector.start()
+    return collector
+
+def fetch_metrics():
+    # O coletor mantém a chave quente; se ele atrasar, o cache serve o snapshot
+    # antigo e dispara uma única atualização em segundo plano
+    collector = get_collector()
+    try:
+        with tracing.span("fetch.metrics"):
+            snapshot = get_query_cache().get(METRICS_KEY, collector.poll_once)
+    except Exception as e:
+        st.error(f"❌ Erro de conexão: {e}")
+        return pd.DataFrame(), pd.DataFrame(), None
+    if snapshot.error:
+        st.error(f"❌ Erro de conexão: {snapshot.error}")
+    return snapshot.history, snapshot.tasks, snapshot.version
+
+def fetch_history(range_name):
+    span  = history.RANGES[range_name]
+    sql, params = history.build_history_query(span)
+    pool  = get_db_pool()
+    def load():
+        with pool.connection() as conn:
+            return history.fetch_history(conn, span)
+    # Baldes largos mudam devagar: o TTL acompanha a largura do balde
+    ttl = max(CACHE_TTL_S, params[0].total_seconds() / 2)
+    try:
+        with tracing.span("fetch.history"):
+            entry = get_query_cache().get_entry(cache_key(sql, params), load, ttl=ttl)
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar histórico: {e}")
+        return pd.DataFrame(), None
+    return entry.value, entry.version
+
+def fetch_process_page(filters, sort, after):
+    sql, params = processes.build_process_query(filters, sort, after, PROC_PAGE_SIZE + 1)
+    pool = get_db_pool()
+    def load():
+        with pool.connection() as conn:
+            return processes.fetch_processes(conn, filters, sort, after, PROC_PAGE_SIZE)
+    try:
+        with tracing.span("fetch.processes"):
+            return get_query_cache().get(cache_key(sql, params), load, ttl=COLLECT_INTERVAL_S)
+    except Exception as e:
+        st.error(f"❌ Erro ao listar processos: {e}")
+        return pd.DataFrame(), None
+
+def fetch_durations(filters):
+    sql, params = processes.build_duration_query(filters)
+    pool = get_db_pool()
+    def load():
+        with pool.connection() as conn:
+            return processes.fetch_durations(conn, filters)
+    try:
+        with tracing.span("fetch.durations"):
+            return get_query_cache().get(cache_key(sql, params), load, ttl=COLLECT_INTERVAL_S)
+    except Exception as e:
+        st.error(f"❌ Erro ao medir durações: {e}")
+        return pd.DataFrame(columns=["pid", "status", "duracao_ms"])
+
+def fetch_lock_graph():
+    pool = get_db_pool()
+    def load():
+        with pool.connection() as conn:
+            return locks.fetch_lock_graph(conn)
+    try:
+        with tracing.span("fetch.locks"):
+            return get_query_cache().get(cache_key(locks.LOCKS_SQL), load, ttl=COLLECT_INTERVAL_S)
+    except Exception as e:
+        st.error(f"❌ Erro ao analisar bloqueios: {e}")
+        return None
+
+@st.cache_resource
+def get_figure_factory():
+    return FigureFactory()
+
+@st.cache_resource
+def get_diagnosis_service():
+    # Mesmo limite dos jobs: no máximo DIAG_MAX_WORKERS gerações simultâneas no modelo
+    return DiagnosisService(get_model(), PROJECT_REF, ttl=DIAG_TTL_S, max_concurrent=DIAG_MAX_WORKERS)
+
+@st.cache_resource
+def get_job_runner():
+    # Limite por processo: no máximo DIAG_MAX_WORKERS chamadas ao Gemini ao mesmo tempo
+    return JobRunner(max_workers=DIAG_MAX_WORKERS, max_pending=4 * DIAG_MAX_WORKERS)
+
+@st.cache_resource
+def get_plan_analyzer():
+    # Planos em cache por fingerprint; PLAN_CACHE_PATH guarda entre reinícios (detecta regressão)
+    return plans.PlanAnalyzer(plans.PlanCache(path=PLAN_CACHE_PATH or None), top_n=PLAN_TOP_N,
+                              timeout_ms=PLAN_TIMEOUT_MS, ttl=PLAN_TTL_S, analyze=PLAN_ANALYZE)
+
+PLANS_KEY = cache_key(plans.SLOW_STATEMENTS_SQL, ("plans",))
+
+def wait_s(deadline):
+    # Espera máxima (pool, cache) até o prazo de um job; None = padrão de cada um
+    return None if deadline is None else budget_ms(deadline) / 1000
+
+def load_plans(deadline=None):
+    # EXPLAIN das consultas mais lentas; só refaz os planos mais velhos que PLAN_TTL_S
+    analyzer = get_plan_analyzer()
+    with get_db_pool().connection(timeout=wait_s(deadline)) as conn:
+        return analyzer.run(conn, deadline)
+
+def fetch_plans(deadline=None):
+    with tracing.span("fetch.plans"):
+        return get_query_cache().get(PLANS_KEY, lambda: load_plans(deadline), ttl=60, timeout=wait_s(deadline))
+
+def diagnosis_context_loader():
+    # Roda dentro do job: um round-trip, reaproveitado por 60s entre sessões
+    pool  = get_db_pool()
+    cache = get_query_cache()
+    # O prazo do job limita a espera por conexão e pelo cache e vira o
+    # statement_timeout das consultas
+    def load(deadline):
+        with pool.connection(timeout=wait_s(deadline)) as conn:
+            return context.fetch_context(conn, timeout_ms=budget_ms(deadline))
+    def build(deadline):
+        try:
+            ctx = cache.get(cache_key(context.CONTEXT_SQL, ("diagnosis",)), lambda: load(deadline), ttl=60,
+                            timeout=wait_s(deadline))
+        except TimeoutError:
+            raise       # prazo do job esgotado: o JobRunner marca timeout
+        except Exception:
+            return ""   # sem contexto o diagnóstico ainda roda com os KPIs
+        try:
+            ctx = dict(ctx, plans=plans.plan_lines(fetch_plans(deadline)))
+        except Exception:
+            pass        # sem planos (permissão, timeout): segue com o resto do contexto
+        return context.render_context(ctx, DIAG_CONTEXT_TOKENS)
+    return build
+
+def plans_job(job):
+    # Função para JobRunner.submit: os EXPLAIN rodam fora do script, como o
+    # diagnóstico; o que resta do prazo do job é o statement_timeout de cada um
+    fetch_plans(job.deadline)
+
+def show_plans():
+    analyzer = get_plan_analyzer()
+    job = get_job_runner().get(st.session_state.get("plans_job"))
+    if job is not None:
+        if not job.finished:
+            st.caption(f"🔬 Analisando planos... ({job.status})")
+        elif job.status == "timeout":
+            st.error(f"❌ Erro ao analisar planos: sem resposta em {job.timeout:.0f}s")
+        elif job.status == "failed":
+            st.error(f"❌ Erro ao analisar planos: {job.error}")
+        was_running = st.session_state.get("plans_running", False)
+        st.session_state.plans_running = not job.finished
+        if was_running and job.finished:
+            # Rerun completo para parar o polling do fragmento
+            st.rerun()
+    if analyzer.last is None:
+        st.caption("Nenhuma análise ainda. Os planos também são coletados a cada diagnóstico.")
+        return
+    analyzed_at, reports = analyzer.last
+    st.caption(f"EXPLAIN (FORMAT JSON) das {len(reports)} consultas mais lentas · {time.strftime('%H:%M:%S', time.localtime(analyzed_at))}")
+    for r in reports:
+        if r["mudanca"] and r["mudanca"]["regressao"]:
+            st.error(f"📉 REGRESSÃO DE PLANO: custo {r['mudanca']['custo_antes']:,.0f} → {r['mudanca']['custo_depois']:,.0f} · {r['query'][:120]}")
+        elif r["mudanca"]:
+            st.info(f"🔀 Plano mudou: custo {r['mudanca']['custo_antes']:,.0f} → {r['mudanca']['custo_depois']:,.0f} · {r['query'][:120]}")
+    rows = [{"consulta": r["query"], "fonte": r["fonte"], "media_ms": r["media_ms"], "chamadas": r["chamadas"],
+             "custo": r["custo"], "achados": " | ".join(a["detalhe"] for a in r["achados"]) or r["erro"] or "—"}
+            for r in reports]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True,
+                 column_config={"media_ms": st.column_config.NumberColumn("média", format="%.1f ms")})
+
+def show_diagnosis_job():
+    job = get_job_runner().get(st.session_state.get("diag_job"))
+    if job is None:
+        return
+    if not job.finished:
+        st.caption(f"🤖 IA analisando seu banco de dados... ({job.status})")
+        if job.text:
+            st.markdown(job.text)
+        if st.button("✖ CANCELAR", key="diag_cancel"):
+            get_job_runner().cancel(job.id)
+            st.rerun()
+    elif job.status == "done":
+        st.markdown(job.text)
+    elif job.status == "cancelled":
+        st.info("Diagnóstico cancelado.")
+    elif job.status == "timeout":
+        st.error(f"Erro na API Gemini: sem resposta em {job.timeout:.0f}s")
+    else:
+        st.error(f"Erro na API Gemini: {job.error}")
+    was_running = st.session_state.get("diag_running", False)
+    st.session_state.diag_running = not job.finished
+    if was_running and job.finished:
+        # Rerun completo para parar o polling do fragmento
+        st.rerun()
+
+# --- FROTA ---
+@st.cache_resource
+def get_fleet_collector():
+    fleet = FleetCollector(FLEET_TARGETS, timeout=FLEET_TIMEOUT_S)
+    collector = MetricsCollector(lambda: (fleet.collect(), pd.DataFrame()), interval=COLLECT_INTERVAL_S)
+    collector.start()
+    return fleet, collector
+
+def fetch_fleet_history(fleet, name):
+    try:
+        entry = get_query_cache().get_entry(cache_key(FLEET_HISTORY_SQL, (name,)), lambda: fleet.fetch_history(name), ttl=CACHE_TTL_S)
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar {name}: {e}")
+        return pd.DataFrame(), None
+    return entry.value, entry.version
+
+def show_fleet():
+    fleet, collector = get_fleet_collector()
+    snapshot = collector.wait_first(timeout=FLEET_TIMEOUT_S + 5)
+    if snapshot is None or snapshot.history.empty:
+        st.warning("⚠️ Nenhuma coleta da frota ainda.")
+        return
+    grid = snapshot.history
+    ok = grid[grid["status"] == "ok"]
+    k1,k2,k3,k4 = st.columns(4)
+    k1.metric("🗄️ ALVOS",           len(grid))
+    k2.metric("🟢 ONLINE",          len(ok))
+    k3.metric("🔴 COM FALHA",       len(grid) - len(ok))
+    k4.metric("⏱️ COLETA (rodada)", f"{snapshot.duration_ms:.0f}ms")
+
+    st.subheader("VISÃO GERAL")
+    for start in range(0, len(grid), 4):
+        for col, row in zip(st.columns(4), grid.iloc[start:start + 4].to_dict("records")):
+            icon = {"ok": "🟢", "timeout": "🟠", "stale": "🟠"}.get(row["status"], "🔴")
+            if row["status"] == "ok":
+                body = (f"CPU {row.get('cpu_usage', float('nan')):.1f}% · {row.get('sessoes_ativas', 0)} ativas · "
+                        f"{row.get('avg_latency_ms', float('nan')):.1f}ms · cache {row.get('cache_hit_pct', float('nan')):.1f}%")
+            else:
+                body = row.get("erro", row["status"])
+            col.markdown(f'<div class="metric-card" style="margin-bottom:12px"><div style="font-family:Orbitron,monospace;color:#00ffc3;font-size:12px">{icon} {row["alvo"]}</div>'
+                         f'<div style="font-family:Share Tech Mono,monospace;color:rgba(0,255,195,0.6);font-size:11px;margin-top:6px">{body}</div></div>',
+                         unsafe_allow_html=True)
+    with st.expander("📋 Tabela da frota"):
+        st.dataframe(grid, use_container_width=True, hide_index=True)
+
+    st.subheader("DETALHE DO ALVO")
+    name = st.selectbox("ALVO", [t.name for t in FLEET_TARGETS], key="fleet_target", label_visibility="collapsed")
+    target_df, target_version = fetch_fleet_history(fleet, name)
+    if target_df.empty:
+        st.info("Sem histórico de métricas neste alvo.")
+        return
+    figures = get_figure_factory()
+    g1,g2 = st.columns(2)
+    with g1:
+        st.subheader("CPU × TEMPO")
+        st.plotly_chart(figures.get("cpu", f"frota:{name}", target_version, target_df), use_container_width=True)
+    with g2:
+        st.subheader("LATÊNCIA × TEMPO")
+        st.plotly_chart(figures.get("latency", f"frota:{name}", target_version, target_df), use_container_width=True)
+
+
+def show_perf():
+    tracer = tracing.tracer
+    if not tracer.enabled:
+        st.info("Medição desligada. Ative com PERF_TRACING = true nos secrets.")
+        return
+    rows = tracer.stats()
+    if not rows:
+        st.info("Nenhum span registrado ainda.")
+        return
+    ms = st.column_config.NumberColumn(format="%.2f ms")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True,
+                 column_config={c: ms for c in ("p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms", "total_ms")})
+    p1, p2 = st.columns(2)
+    p1.download_button("⬇ PROMETHEUS", tracer.prometheus(), file_name="db_sentinel_spans.prom", mime="text/plain")
+    if p2.button("↺ ZERAR", key="perf_reset"):
+        tracer.reset()
+        st.rerun()
+    if PERF_JSONL:
+        st.caption(f"Spans também gravados em {PERF_JSONL} (JSONL)")
+
+# --- DASHBOARD PRINCIPAL ---
+def render():
+    # Um span por rerun completo; st.stop/st.rerun também fecham o span
+    with tracing.span("rerun.dashboard"):
+        _render()
+
+def _render():
+    st.set_page_config(page_title="DB Sentinel | Dashboard", page_icon="🛡️", layout="wide")
+
+    st.markdown("""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@700;900&family=Share+Tech+Mono&display=swap');
+    body, .stApp, [data-testid="stAppViewContainer"] { background: #020408 !important; }
+    [data-testid="stHeader"] { background: rgba(4,8,15,0.95) !important; }
+    [data-testid="stSidebar"] { background: #04080f !important; border-right: 1px solid rgba(0,255,195,0.1); }
+    .metric-card { background:#04080f; border-radius:12px; padding:20px; border:1px solid rgba(0,255,195,0.1); }
+    h1,h2,h3 { font-family:'Orbitron',monospace !important; color:#00ffc3 !important; letter-spacing:.08em !important; }
+    .stMetric { background: #04080f; border-radius: 12px; padding: 16px; border: 1px solid rgba(0,255,195,0.1); }
+    .stMetric label { font-family:'Share Tech Mono',monospace !important; color:rgba(0,255,195,0.5) !important; font-size:10px !important; letter-spacing:.15em !important; }
+    .stMetric [data-testid="metric-container"] > div:first-child { color: #00ffc3 !important; font-family:'Orbitron',monospace !important; }
+    .stTabs [data-baseweb="tab"] { font-family:'Orbitron',monospace !important; font-size:10px !important; letter-spacing:.1em !important; color:rgba(0,255,195,0.4) !important; }
+    .stTabs [aria-selected="true"] { color:#00ffc3 !important; }
+    .stButton > button { background:transparent !important; border:1px solid #00ffc3 !important; color:#00ffc3 !important; font-family:'Orbitron',monospace !important; font-size:11px !important; letter-spacing:.1em !important; border-radius:8px !important; }
+    .stButton > button:hover { background:#00ffc3 !important; color:#020408 !important; }
+    .stDataFrame { background:#04080f !important; }
+    footer { visibility:hidden; }
+    .helyo-footer { text-align:center; font-family:'Share Tech Mono',monospace; color:rgba(0,255,195,0.2); font-size:10px; letter-spacing:.2em; padding:20px 0; border-top:1px solid rgba(0,255,195,0.05); margin-top:20px; }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # --- TOPBAR ---
+    fleet_mode = bool(FLEET_TARGETS) and st.sidebar.radio("MODO", ["PROJETO", "FROTA"], key="mode") == "FROTA"
+    topbar_host = f"FROTA · {len(FLEET_TARGETS)} alvos" if fleet_mode else f"{PROJECT_REF}.supabase.co"
+    col_logo, col_status, col_logout = st.columns([6,1,1])
+    with col_logo:
+        st.markdown(f"""
+        <div style="display:flex;align-items:center;gap:14px;padding:8px 0">
+            <span style="font-size:28px">🛡️</span>
+            <div>
+                <div style="font-family:Orbitron,monospace;font-weight:900;font-size:18px;color:#00ffc3;text-shadow:0 0 15px #00ffc355;letter-spacing:.1em">DB SENTINEL</div>
+                <div style="font-family:Share Tech Mono,monospace;font-size:10px;color:rgba(0,255,195,0.4)">{topbar_host}</div>
+            </div>
+        </div>""", unsafe_allow_html=True)
+    with col_status:
+        st.markdown('<div style="margin-top:16px;background:rgba(74,222,128,0.1);border:1px solid rgba(74,222,128,0.4);border-radius:8px;padding:6px 12px;text-align:center;font-family:Share Tech Mono,monospace;color:#4ade80;font-size:11px">🟢 ONLINE</div>', unsafe_allow_html=True)
+    with col_logout:
+        if st.button("LOGOUT"):
+            st.session_state.authenticated = False
+            st.session_state.show_splash   = False
+            st.rerun()
+
+    st.divider()
+
+    if SAMPLER_ENABLED:
+        get_sampler()
+
+    if fleet_mode:
+        show_fleet()
+        st.markdown('<div class="helyo-footer">── development by helyo tools ──</div>', unsafe_allow_html=True)
+        st.stop()
+
+    df, tasks, data_version = fetch_metrics()
+    if df.empty:
+        st.warning("⚠️ Sem dados. Verifique a conexão.")
+        st.stop()
+
+    latest = df.iloc[0]
+
+    # --- KPIs ---
+    c1,c2,c3,c4 = st.columns(4)
+    c1.metric("🖥️ CPU LOAD",        f"{latest.get('cpu_usage',0):.1f}%")
+    c2.metric("🔗 CONEXÕES",        int(latest.get('active_connections',0)))
+    c3.metric("⏱️ LATÊNCIA",        f"{latest.get('avg_latency_ms',0):.1f}ms")
+    c4.metric("⚠️ SLOW QUERIES",    int(latest.get('slow_queries_count',0)))
+
+    alert_engine = get_alert_engine()
+    for alert in alert_engine.active():
+        show = st.error if alert["severidade"] == "critical" else st.warning
+        show(f"🚨 {alert['regra']}: {alert['metrica']} = {alert['valor']:.1f} ({alert['detalhe']}) desde {alert['timestamp']}")
+    if alert_engine.events:
+        with st.expander(f"🔔 ALERTAS RECENTES ({len(alert_engine.events)})"):
+            st.dataframe(pd.DataFrame(list(alert_engine.events)[::-1]), use_container_width=True, hide_index=True)
+
+    st.divider()
+
+    # --- ABAS ---
+    # Aba PERF escondida: só com ?perf=1 na URL
+    show_perf_tab = st.query_params.get("perf") == "1"
+    tab1, tab2, tab3, *tab_perf = st.tabs(["📊  DASHBOARD", "🧠  IA DIAGNÓSTICO", "🔍  PROCESSOS"]
+                                          + (["⏱️  PERF"] if show_perf_tab else []))
+
+    with tab1:
+        range_name = st.radio("JANELA", list(history.RANGES), horizontal=True, key="history_range", label_visibility="collapsed")
+        df_range, range_version = (df, data_version) if history.RANGES[range_name] is None else fetch_history(range_name)
+        if df_range.empty:
+            st.info("Sem amostras nesta janela.")
+            df_range, range_name, range_version = df, "AO VIVO", data_version
+        # Figuras montadas uma vez por versão dos dados e compartilhadas entre sessões
+        with tracing.span("render.charts"):
+            figures = get_figure_factory()
+            g1,g2 = st.columns(2)
+            with g1:
+                st.subheader("CPU × TEMPO")
+                st.plotly_chart(figures.get("cpu", range_name, range_version, df_range), use_container_width=True)
+            with g2:
+                st.subheader("LATÊNCIA × TEMPO")
+                st.plotly_chart(figures.get("latency", range_name, range_version, df_range), use_container_width=True)
+            st.subheader("CONEXÕES × TEMPO")
+            st.plotly_chart(figures.get("connections", range_name, range_version, df_range), use_container_width=True)
+
+    with tab2:
+        st.subheader("DIAGNÓSTICO COM IA")
+        st.caption("Análise automática dos dados reais do Supabase via Gemini AI")
+        if st.button("🔍 EXECUTAR DIAGNÓSTICO", key="diag"):
+            # Roda no pool de jobs; a tela só consulta o andamento
+            try:
+                job = get_job_runner().submit(diagnosis_job(get_diagnosis_service(), latest, diagnosis_context_loader()), timeout=DIAG_TIMEOUT_S)
+                st.session_state.diag_job = job.id
+                st.session_state.diag_running = True
+            except JobRejected:
+                st.warning("⏳ Muitos diagnósticos em andamento. Tente novamente em instantes.")
+        poll_every = 1.0 if st.session_state.get("diag_running") else None
+        st.fragment(run_every=poll_every)(show_diagnosis_job)()
+        with st.expander("🔬 PLANOS DAS QUERIES LENTAS"):
+            if st.button("🔬 ANALISAR PLANOS", key="plans_run"):
+                # Até PLAN_TOP_N EXPLAINs de PLAN_TIMEOUT_MS cada, no mesmo pool de jobs do diagnóstico
+                try:
+                    job = get_job_runner().submit(plans_job, timeout=PLAN_TOP_N * PLAN_TIMEOUT_MS / 1000 + 10)
+                    st.session_state.plans_job = job.id
+                    st.session_state.plans_running = True
+                except JobRejected:
+                    st.warning("⏳ Muitas análises em andamento. Tente novamente em instantes.")
+            poll_every = 1.0 if st.session_state.get("plans_running") else None
+            st.fragment(run_every=poll_every)(show_plans)()
+
+    with tab3:
+        st.subheader("PROCESSOS EM EXECUÇÃO")
+        f1,f2,f3,f4,f6,f5 = st.columns([3,2,1,2,2,1])
+        proc_states = f1.multiselect("ESTADO", processes.STATES, default=list(processes.BUSY_STATES), key="proc_states")
+        proc_user   = f2.text_input("USUÁRIO", key="proc_user").strip()
+        proc_min_s  = f3.number_input("MÍN. (s)", min_value=0, value=0, step=1, key="proc_min_s")
+        proc_wait   = f4.selectbox("WAIT TYPE", [""] + processes.WAIT_EVENT_TYPES, key="proc_wait")
+        proc_event  = f6.text_input("WAIT EVENT", key="proc_wait_event", placeholder="ex.: ClientRead").strip()
+        proc_sort   = f5.selectbox("ORDEM", list(processes.SORTS), key="proc_sort")
+        proc_filters = {
+            "states":          tuple(proc_states),
+            "user":            proc_user or None,
+            "min_duration":    timedelta(seconds=proc_min_s) if proc_min_s else None,
+            "wait_event_type": proc_wait or None,
+            "wait_event":      proc_event or None,
+        }
+        # Filtro ou ordem mudou: volta para a primeira página
+        proc_sig = (tuple(proc_filters.items()), proc_sort)
+        if st.session_state.get("proc_sig") != proc_sig:
+            st.session_state.proc_sig   = proc_sig
+            st.session_state.proc_pages = [None]
+        proc_pages = st.session_state.proc_pages
+        page, next_after = fetch_process_page(proc_filters, proc_sort, proc_pages[-1])
+        if page.empty:
+            st.info("Nenhum processo ativo.")
+        else:
+            st.dataframe(page, use_container_width=True, hide_index=True,
+                         column_config={"duracao_ms": st.column_config.NumberColumn("duração", format="%.0f ms")})
+        n1, n2, n3 = st.columns([1,4,1])
+        if len(proc_pages) > 1 and n1.button("◀ ANTERIOR", key="proc_prev"):
+            proc_pages.pop()
+            st.rerun()
+        n2.caption(f"Página {len(proc_pages)}")
+        if next_after is not None and n3.button("PRÓXIMA ▶", key="proc_next"):
+            proc_pages.append(next_after)
+            st.rerun()
+
+        durations = fetch_durations(proc_filters)
+        if not durations.empty:
+            h1, h2 = st.columns(2)
+            with h1:
+                st.subheader("DURAÇÃO DAS SESSÕES")
+                st.plotly_chart(duration_figure(processes.duration_histogram(durations["duracao_ms"])), use_container_width=True)
+            with h2:
+                st.subheader("MAIS LONGAS")
+                st.dataframe(processes.longest_running(durations), use_container_width=True, hide_index=True,
+                             column_config={"duracao_ms": st.column_config.NumberColumn("duração", format="%.0f ms")})
+
+        st.subheader("BLOQUEIOS")
+        lock_graph = fetch_lock_graph()
+        if lock_graph is not None:
+            if not lock_graph.roots:
+                st.info("Nenhuma sessão esperando lock.")
+            else:
+                b1, b2, b3 = st.columns(3)
+                b1.metric("🔒 BLOQUEADORES RAIZ", len(lock_graph.roots))
+                b2.metric("⏳ SESSÕES BLOQUEADAS", lock_graph.blocked_count)
+                b3.metric("🔗 CADEIA MAIS LONGA", lock_graph.max_depth)
+                st.code("\n".join(lock_graph.tree_lines()), language=None)
+
+        st.subheader("FORMATOS DE QUERY")
+        if tasks.empty:
+            st.info("Nenhuma sessão fora de idle.")
+        else:
+            st.dataframe(tasks, use_container_width=True, hide_index=True,
+                         column_config={"maior_duracao_ms": st.column_config.NumberColumn("maior duração", format="%.0f ms")})
+        with st.expander("📊 Histórico Completo"):
+            st.dataframe(df, use_container_width=True, hide_index=True)
+
+    if tab_perf:
+        with tab_perf[0]:
+            st.subheader("TEMPO POR SPAN")
+            show_perf()
+
+    # Footer
+    st.markdown('<div class="helyo-footer">── development by helyo tools ──</div>', unsafe_allow_html=True)
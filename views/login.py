@@ -0,0 +1,214 @@
+"""
+Tela de login e de redefinição de senha.
+
+Só importa streamlit: o SDK do Gemini, pandas, plotly e psycopg2 ficam para o
+dashboard, então a primeira tela abre rápido e os reruns não autenticados
+são baratos.
+"""
+
+import hashlib
+import hmac
+
+import streamlit as st
+
+
+# --- FUNÇÃO DE ENVIO DE E-MAIL ---
+def send_reset_email(target_email):
+    # smtplib/email só quando alguém pede a redefinição
+    from sentinel.notify import missing_smtp, send_mail
+
+    # Verifica se os secrets de SMTP existem antes de prosseguir
+    missing = missing_smtp(st.secrets)
+    
+    if missing:
+        st.error(f"⚠️ Configuração de e-mail incompleta. Faltam os segredos: {', '.join(missing)}")
+        st.info("Adicione estas chaves no painel 'Secrets' do Streamlit Cloud.")
+        return False
+
+    try:
+        # Gera um token simples (Hash do email + segredo)
+        secret = st.secrets["DB_PASS"]
+        token = hmac.new(secret.encode(), target_email.encode(), hashlib.sha256).hexdigest()
+        reset_link = f"https://caike-souza-db-sentinel.streamlit.app/?token={token}&email={target_email}"
+
+        send_mail(st.secrets, target_email, "DB Sentinel | Redefinição de Senha",
+                  f"Olá,\n\nRecebemos uma solicitação de redefinição de senha para sua conta no DB Sentinel.\n\nClique no link abaixo para criar uma nova senha:\n{reset_link}\n\nSe você não solicitou isso, ignore este e-mail.")
+        return True
+    except Exception as e:
+        st.error(f"Erro ao enviar e-mail: {e}")
+        return False
+
+
+def render():
+    st.set_page_config(page_title="DB Sentinel | Login", page_icon="🛡️", layout="wide")
+
+    st.markdown("""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&display=swap');
+
+    body, .stApp { background: #f0f0f0 !important; color: #000000 !important; font-family: 'Inter', sans-serif; }
+    [data-testid="stAppViewContainer"] { background: #f0f0f0; }
+    [data-testid="stHeader"] { background: transparent; }
+
+    /* Centralizar conteúdo verticalmente */
+    .stMainBlockContainer {
+        display: flex;
+        flex-direction: column;
+        justify-content: center;
+        min-height: 100vh;
+        padding-top: 0 !important;
+    }
+
+    /* Branding Section */
+    .branding-container {
+        text-align: center;
+        padding-right: 40px;
+    }
+    .logo-emoji {
+        font-size: 160px;
+        margin-bottom: 30px;
+    }
+    .main-title {
+        font-family: 'Inter', sans-serif;
+        font-size: 52px; font-weight: 800;
+        color: #1a1a2e; letter-spacing: -0.025em;
+        line-height: 1;
+        margin-bottom: 20px;
+        text-transform: uppercase;
+    }
+    .sub-title {
+        color: #4b5563; font-size: 16px; font-weight: 600;
+        letter-spacing: 0.1em; text-transform: uppercase;
+    }
+
+    /* Login Card Section */
+    [data-testid="stForm"] {
+        background: #ffffff !important;
+        padding: 50px !important;
+        border-radius: 10px !important;
+        box-shadow: 0 15px 35px rgba(0,0,0,0.08) !important;
+        border: none !important;
+        max-width: 440px;
+        margin: 0 auto;
+    }
+
+    .login-header {
+        font-size: 28px; font-weight: 700;
+        color: #111827; margin-bottom: 40px;
+        font-family: 'Inter', sans-serif;
+    }
+
+    /* Input Styling to match mockup */
+    .stTextInput label {
+        font-family: 'Inter', sans-serif !important;
+        font-weight: 600 !important;
+        color: #4b5563 !important;
+        font-size: 13px !important;
+        margin-bottom: 12px !important;
+        text-transform: uppercase;
+    }
+
+    .stTextInput > div > div > input {
+        background: #ffffff !important;
+        border: 1px solid #e5e7eb !important;
+        color: #000000 !important;
+        border-radius: 6px !important;
+        padding: 14px !important;
+        font-size: 14px !important;
+        height: 48px !important;
+    }
+
+    .stTextInput > div > div {
+        background: transparent !important;
+        border: none !important;
+    }
+
+    /* Button Styling (Purple) */
+    .stButton > button {
+        width: 100%;
+        background: #5843e0 !important;
+        color: #ffffff !important;
+        font-family: 'Inter', sans-serif !important;
+        font-weight: 600 !important;
+        padding: 14px !important;
+        border-radius: 6px !important;
+        border: none !important;
+        margin-top: 20px !important;
+        height: 50px !important;
+        text-transform: uppercase;
+        font-size: 13px !important;
+        letter-spacing: 0.05em !important;
+    }
+    .stButton > button:hover { background: #4736b4 !important; }
+
+    /* Links */
+    .reset-trigger-button button {
+        background: none !important;
+        border: none !important;
+        color: #5880ec !important; /* Blue-ish purple as in print */
+        font-size: 15px !important;
+        font-weight: 500 !important;
+        padding: 0 !important;
+        margin-top: 30px !important;
+        box-shadow: none !important;
+        text-decoration: none !important;
+    }
+    .reset-trigger-button button:hover { text-decoration: underline !important; }
+
+    .link-footer {
+        text-align: center; margin-top: 50px;
+        color: #9ca3af; font-size: 12px;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Layout Principal em Colunas com razão mais próxima ao print
+    col_l, col_brand, col_gap, col_login, col_r = st.columns([2, 5, 1, 5, 2])
+
+    with col_brand:
+        st.markdown("""
+        <div class="branding-container">
+            <div class="logo-emoji">🛡️</div>
+            <div class="main-title">DB SENTINEL</div>
+            <div class="sub-title">SECURE ACCESS TERMINAL</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col_login:
+        if st.session_state.reset_mode:
+            st.markdown('<div class="login-header">Redefinir Senha</div>', unsafe_allow_html=True)
+            with st.form("reset_form"):
+                reset_email = st.text_input("E-MAIL")
+                submitted = st.form_submit_button("SOLICITAR NOVA SENHA")
+                if submitted:
+                    if reset_email:
+                        send_reset_email(reset_email)
+                    else: st.warning("Informe o e-mail.")
+
+            st.markdown('<div class="reset-trigger-button" style="text-align:center;">', unsafe_allow_html=True)
+            if st.button("Voltar ao Login"):
+                st.session_state.reset_mode = False
+                st.rerun()
+            st.markdown('</div>', unsafe_allow_html=True)
+        else:
+            st.markdown('<div class="login-header">LOGIN</div>', unsafe_allow_html=True)
+            with st.form("login_form"):
+                email = st.text_input("E-MAIL", placeholder="seu@email.com")
+                password = st.text_input("SENHA", type="password", placeholder="******")
+                login_submit = st.form_submit_button("ACESSAR SISTEMA")
+
+                if login_submit:
+                    if email == "caike@helyo.com.br" and password == "123456":
+                        st.session_state.authenticated = True
+                        st.session_state.show_splash = True
+                        st.rerun()
+                    else:
+                        st.error("Credenciais inválidas.")
+
+            st.markdown('<div class="reset-trigger-button" style="text-align:center;">', unsafe_allow_html=True)
+            if st.button("Redefinir Senha"):
+                st.session_state.reset_mode = True
+                st.rerun()
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        st.markdown('<div class="link-footer">── development by helyo tools ──</div>', unsafe_allow_html=True)
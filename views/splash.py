@@ -0,0 +1,99 @@
+"""
+Tela de abertura exibida logo após o login.
+"""
+
+import streamlit as st
+
+
+def render():
+    st.set_page_config(page_title="DB Sentinel", page_icon="🛡️", layout="centered")
+    st.markdown("""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@700;900&family=Share+Tech+Mono&display=swap');
+    body, .stApp, [data-testid="stAppViewContainer"] { background: #020408 !important; }
+    [data-testid="stHeader"] { background: transparent; }
+    @keyframes logoReveal {
+        0%  { letter-spacing: 2em; opacity: 0; filter: blur(20px); }
+        60% { letter-spacing: .15em; opacity: 1; filter: blur(0); }
+        100%{ letter-spacing: .08em; opacity: 1; }
+    }
+    @keyframes glowPulse {
+        0%,100%{ text-shadow: 0 0 20px #00ffc355, 0 0 60px #00ffc322; }
+        50%    { text-shadow: 0 0 40px #00ffc388, 0 0 100px #00ffc344; }
+    }
+    @keyframes fadeUp {
+        from{ opacity:0; transform:translateY(20px); }
+        to  { opacity:1; transform:translateY(0); }
+    }
+    @keyframes ringPulse {
+        0%  { transform:scale(.5); opacity:.8; }
+        100%{ transform:scale(2.5); opacity:0; }
+    }
+    @keyframes slideHelyo {
+        from{ opacity:0; transform:translateX(-20px); }
+        to  { opacity:1; transform:translateX(0); }
+    }
+    .splash-wrap {
+        text-align: center; padding: 80px 20px;
+        display: flex; flex-direction: column; align-items: center;
+    }
+    .splash-icon { font-size: 80px; margin-bottom: 24px; filter: drop-shadow(0 0 30px #00ffc388); animation: fadeUp .6s ease both; }
+    .splash-title {
+        font-family: 'Orbitron', monospace; font-weight: 900;
+        font-size: clamp(32px,6vw,64px);
+        color: #00ffc3; letter-spacing: .08em;
+        animation: logoReveal 1.4s cubic-bezier(.16,1,.3,1) .3s both, glowPulse 3s ease 1.8s infinite;
+    }
+    .splash-sub {
+        font-family: 'Share Tech Mono', monospace;
+        color: rgba(0,255,195,0.5); font-size: 12px;
+        letter-spacing: .25em; margin-top: 12px;
+        animation: fadeUp .6s ease 1.6s both;
+    }
+    .splash-divider {
+        display: flex; align-items: center; gap: 14px; margin: 12px 0;
+        animation: fadeUp .6s ease 1.9s both;
+    }
+    .splash-divider span { font-family:'Share Tech Mono',monospace; color:rgba(0,255,195,0.3); font-size:10px; letter-spacing:.2em; }
+    .splash-divider div  { height:1px; width:60px; background:rgba(0,255,195,0.2); }
+    .helyo-footer {
+        position: fixed; bottom: 28px; width: 100%; text-align: center;
+        font-family: 'Share Tech Mono', monospace;
+        color: rgba(0,255,195,0.3); font-size: 10px; letter-spacing: .25em;
+        animation: slideHelyo 1s ease 2.2s both;
+    }
+    .stButton > button {
+        background: transparent !important;
+        border: 1px solid #00ffc3 !important;
+        color: #00ffc3 !important;
+        font-family: 'Orbitron', monospace !important;
+        font-weight: 700 !important; font-size: 12px !important;
+        letter-spacing: .2em !important; padding: 16px 48px !important;
+        border-radius: 8px !important;
+        box-shadow: 0 0 20px rgba(0,255,195,0.2) !important;
+        margin-top: 40px !important;
+        animation: fadeUp .6s ease 2s both !important;
+    }
+    .stButton > button:hover {
+        background: #00ffc3 !important; color: #020408 !important;
+        box-shadow: 0 0 40px rgba(0,255,195,0.5) !important;
+    }
+    </style>
+    <div class="splash-wrap">
+        <div class="splash-icon">🛡️</div>
+        <div class="splash-title">DB SENTINEL</div>
+        <div class="splash-sub">INTELLIGENT DATABASE MONITORING</div>
+        <div class="splash-divider">
+            <div></div>
+            <span>SUPABASE + GEMINI AI</span>
+            <div></div>
+        </div>
+    </div>
+    <div class="helyo-footer">── development by helyo tools ──</div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1,1,1])
+    with col2:
+        if st.button("INICIAR MONITORAMENTO ▶"):
+            st.session_state.show_splash = False
+            st.rerun()